@@ -0,0 +1,181 @@
+import hashlib
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.core.cache import cache, caches
+
+from blogicum.constants import (SINGLE_FLIGHT_LOCK_TIMEOUT, SINGLE_FLIGHT_POLL,
+                                SINGLE_FLIGHT_WAIT)
+
+INDEX_TAG = "feed:index"
+STATS_KEYS = {
+    "hits": "page-cache:hits",
+    "misses": "page-cache:misses",
+    "hit_time": "page-cache:hit-time-us",
+    "miss_time": "page-cache:miss-time-us",
+}
+
+
+def incr(key, delta=1, backend=cache):
+    try:
+        return backend.incr(key, delta)
+    except ValueError:
+        backend.add(key, 0, None)
+        return backend.incr(key, delta)
+
+
+def post_tag(post_id):
+    return f"post:{post_id}"
+
+
+def category_tag(slug):
+    return f"category:{slug}"
+
+
+def author_tag(username):
+    return f"author:{username}"
+
+
+def location_tag(location_id):
+    return f"location:{location_id}"
+
+
+def _tag_key(tag):
+    return f"tag:{tag}"
+
+
+def get_tag_versions(tags):
+    keys = {tag: _tag_key(tag) for tag in tags}
+    found = cache.get_many(keys.values())
+    missing = [key for key in keys.values() if key not in found]
+    if missing:
+        # A tag nobody has seen yet (or one evicted from the cache) starts
+        # from a fresh value, so entries stamped before eviction go stale.
+        for key in missing:
+            cache.add(key, time.time_ns(), None)
+        found.update(cache.get_many(missing))
+    return {tag: found.get(key) for tag, key in keys.items()}
+
+
+def invalidate_tags(tags):
+    keys = [_tag_key(tag) for tag in tags]
+    current = cache.get_many(keys)
+    now = time.time_ns()
+    # Versions double as change timestamps, which lets them back
+    # Last-Modified; they still never move backwards.
+    cache.set_many(
+        {key: max(now, current.get(key, 0) + 1) for key in keys}, None
+    )
+
+
+def peek_tagged(key):
+    entry = cache.get(key)
+    if entry is None:
+        return None, False
+    versions, value = entry
+    return entry, get_tag_versions(versions) == versions
+
+
+def get_tagged_entry(key):
+    entry, fresh = peek_tagged(key)
+    return entry if fresh else None
+
+
+def get_tagged(key):
+    entry = get_tagged_entry(key)
+    return None if entry is None else entry[1]
+
+
+def set_tagged(key, value, tags, timeout, versions=None):
+    versions = dict(versions or {})
+    missing = set(tags) - versions.keys()
+    if missing:
+        versions.update(get_tag_versions(missing))
+    cache.set(key, (versions, value), timeout)
+    return versions
+
+
+@contextmanager
+def single_flight(key):
+    lock_key = f"lock:{key}"
+    token = uuid.uuid4().hex
+    leader = cache.add(lock_key, token, SINGLE_FLIGHT_LOCK_TIMEOUT)
+    try:
+        yield leader
+    finally:
+        # A lock that outlived its timeout may belong to someone else now.
+        if leader and cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def wait_for_tagged(key):
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(SINGLE_FLIGHT_POLL)
+        entry = get_tagged_entry(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_or_set_tagged(key, compute, tags, timeout):
+    entry, fresh = peek_tagged(key)
+    if fresh:
+        return entry[1]
+    with single_flight(key) as leader:
+        # The leader may have only just finished: a waiter that got the
+        # lock right after it reuses the fresh value.
+        entry = (
+            get_tagged_entry(key) if leader
+            # Someone else is already rebuilding: serve the stale value,
+            # or wait briefly for theirs before doing the work too.
+            else entry or wait_for_tagged(key)
+        )
+        if entry is not None:
+            return entry[1]
+        versions = get_tag_versions(tags)
+        value = compute()
+        set_tagged(key, value, tags, timeout, versions)
+        return value
+
+
+def versions_etag(versions, variant=""):
+    digest = hashlib.md5(
+        repr((sorted(versions.items()), variant)).encode(),
+        usedforsecurity=False,
+    )
+    return f'"{digest.hexdigest()}"'
+
+
+def versions_last_modified(versions):
+    return max(versions.values()) // 1_000_000_000
+
+
+def record_page_cache(hit, seconds):
+    counter, timer = ("hits", "hit_time") if hit else ("misses", "miss_time")
+    stats_cache = caches["page_stats"]
+    incr(STATS_KEYS[counter], backend=stats_cache)
+    incr(STATS_KEYS[timer], int(seconds * 1_000_000), stats_cache)
+
+
+def page_cache_stats():
+    values = caches["page_stats"].get_many(STATS_KEYS.values())
+    stats = {name: values.get(key, 0) for name, key in STATS_KEYS.items()}
+    requests = stats["hits"] + stats["misses"]
+    return {
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "hit_ratio": stats["hits"] / requests if requests else 0,
+        "avg_hit_ms": (
+            stats["hit_time"] / stats["hits"] / 1000 if stats["hits"] else 0
+        ),
+        "avg_miss_ms": (
+            stats["miss_time"] / stats["misses"] / 1000
+            if stats["misses"] else 0
+        ),
+    }
+
+
+def reset_page_cache_stats():
+    caches["page_stats"].delete_many(STATS_KEYS.values())
@@ -1,15 +1,32 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from PIL import Image
 
 from .models import Comment, Post
 
 User = get_user_model()
 
 
+class UploadedImageField(forms.ImageField):
+    def to_python(self, data):
+        error = getattr(data, "upload_error", None)
+        if error:
+            raise ValidationError(error, code="invalid_image")
+        if getattr(data, "image_format", None) is None:
+            return super().to_python(data)
+        # The upload handler has already checked the header; unlike
+        # ImageField this does not open the file with Pillow again.
+        file = forms.FileField.to_python(self, data)
+        file.content_type = Image.MIME.get(data.image_format)
+        return file
+
+
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ("author",)
+        field_classes = {"image": UploadedImageField}
         widgets = {"pub_date": forms.DateInput(attrs={"type": "date"})}
 
 
@@ -0,0 +1,59 @@
+import base64
+import json
+import re
+
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .forms import CommentForm
+
+HOLE_RE = re.compile(rb"<!--hole:([\w=-]+)-->")
+FILLED_HOLE_RE = re.compile(rb"(<!--hole:[\w=-]+-->)(.*?)<!--/hole-->", re.S)
+
+HOLES = {
+    "header": ("includes/header.html", dict),
+    "post_actions": ("includes/post_actions.html", dict),
+    "comment_actions": ("includes/comment_actions.html", dict),
+    "comment_form": (
+        "includes/comment_form.html", lambda: {"form": CommentForm()}
+    ),
+    "profile_actions": ("includes/profile_actions.html", dict),
+}
+
+
+def hole_context(name, args):
+    template_name, extra_context = HOLES[name]
+    return template_name, {**args, **extra_context()}
+
+
+def render_hole(request, name, args):
+    template_name, context = hole_context(name, args)
+    return render_to_string(template_name, context, request=request)
+
+
+def render_hole_in(context, name, args):
+    template_name, values = hole_context(name, args)
+    template = context.template.engine.get_template(template_name)
+    with context.push(**values):
+        html = template.render(context)
+    if not context.get("donut"):
+        return mark_safe(html)
+    # The page also goes to the shared cache: the marked hole is cut out
+    # of the stored copy and refilled for every later request.
+    payload = base64.urlsafe_b64encode(json.dumps([name, args]).encode())
+    return mark_safe(f"<!--hole:{payload.decode()}-->{html}<!--/hole-->")
+
+
+def punch_holes(content):
+    return FILLED_HOLE_RE.sub(rb"\1", content)
+
+
+def strip_hole_marks(content):
+    return FILLED_HOLE_RE.sub(rb"\2", content)
+
+
+def fill_holes(content, request):
+    def replace(match):
+        name, args = json.loads(base64.urlsafe_b64decode(match.group(1)))
+        return render_hole(request, name, args).encode()
+    return HOLE_RE.sub(replace, content)
@@ -0,0 +1,112 @@
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+from blogicum.constants import IMAGE_DERIVATIVE_WIDTHS, IMAGE_WORKERS
+
+from .cache import invalidate_tags, post_tag
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVE_FORMATS = {
+    "webp": ("WEBP", {"quality": 80}),
+    "jpeg": ("JPEG", {"quality": 85, "progressive": True}),
+}
+
+
+def derivative_name(name, width, extension):
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(
+        directory, "derivatives", f"{stem}-{width}w.{extension}"
+    )
+
+
+def derivative_url(name, width, extension):
+    return default_storage.url(derivative_name(name, width, extension))
+
+
+def generate_derivatives(name, storage=default_storage):
+    with storage.open(name) as file, Image.open(file) as image:
+        # Browsers turn the original by its EXIF orientation; the copies
+        # carry no EXIF, so the turn is baked into their pixels.
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    widths = [
+        width for width in IMAGE_DERIVATIVE_WIDTHS if width < image.width
+    ] or [image.width]
+    for width in widths:
+        # Copies of a content-addressed original never change, and other
+        # posts may already serve them as immutable: existing ones stay.
+        missing = {
+            extension: derivative_name(name, width, extension)
+            for extension in DERIVATIVE_FORMATS
+            if not storage.exists(derivative_name(name, width, extension))
+        }
+        if not missing:
+            continue
+        resized = image.resize(
+            (width, max(round(image.height * width / image.width), 1)),
+            Image.Resampling.LANCZOS,
+        )
+        for extension, path in missing.items():
+            image_format, options = DERIVATIVE_FORMATS[extension]
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            saved = storage.save(path, ContentFile(buffer.getvalue()))
+            if saved != path:
+                # Another worker wrote the same copy meanwhile.
+                storage.delete(saved)
+    return widths
+
+
+def build_post_derivatives(post_id, name):
+    try:
+        # Same name means same content: copies made for another post with
+        # this image are reused as they are.
+        widths = (
+            Post.objects.filter(image=name)
+            .exclude(image_derivatives=[])
+            .values_list("image_derivatives", flat=True)
+            .first()
+        ) or generate_derivatives(name)
+        # The image may have been replaced while this one was resized.
+        if Post.objects.filter(pk=post_id, image=name).update(
+            image_derivatives=widths
+        ):
+            invalidate_tags([post_tag(post_id)])
+        return widths
+    except Exception:
+        logger.exception("Не удалось подготовить копии изображения %s", name)
+        raise
+
+
+def build_in_worker(post_id, name):
+    try:
+        return build_post_derivatives(post_id, name)
+    finally:
+        # Worker threads open their own connections; nobody else will
+        # close them.
+        connection.close()
+
+
+@lru_cache(maxsize=None)
+def derivative_pool():
+    return ThreadPoolExecutor(
+        max_workers=IMAGE_WORKERS, thread_name_prefix="image-derivatives"
+    )
+
+
+def schedule_derivatives(post_id, name):
+    transaction.on_commit(
+        lambda: derivative_pool().submit(
+            build_in_worker, post_id, name
+        )
+    )
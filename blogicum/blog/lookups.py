@@ -0,0 +1,64 @@
+import threading
+
+from .cache import get_tag_versions, invalidate_tags
+from .models import Category, Location
+
+
+class ModelLookup:
+    def __init__(self, model, tag, fields=("pk",)):
+        self.model = model
+        self.tag = tag
+        self.fields = fields
+        self._lock = threading.Lock()
+        self._version = None
+        self._indexes = {}
+
+    def get(self, **kwargs):
+        [(field, value)] = kwargs.items()
+        return self.indexes()[field].get(value)
+
+    def invalidate(self):
+        invalidate_tags([self.tag])
+
+    def indexes(self, version=None):
+        # The tag version tells whether another process has changed the
+        # table since this copy was loaded.
+        if version is None:
+            version = get_tag_versions([self.tag])[self.tag]
+        if version == self._version:
+            return self._indexes
+        with self._lock:
+            if version != self._version:
+                rows = list(self.model.objects.all())
+                self._indexes = {
+                    field: {getattr(row, field): row for row in rows}
+                    for field in self.fields
+                }
+                self._version = version
+        return self._indexes
+
+
+categories = ModelLookup(Category, "lookup:category", ("pk", "slug"))
+locations = ModelLookup(Location, "lookup:location")
+
+
+def current_indexes(*lookups):
+    # A single cache read checks every lookup, however many rows use them.
+    versions = get_tag_versions([lookup.tag for lookup in lookups])
+    return [lookup.indexes(versions[lookup.tag]) for lookup in lookups]
+
+
+def attach_catalog(posts):
+    if not posts:
+        return posts
+    category_index, location_index = (
+        indexes["pk"] for indexes in current_indexes(categories, locations)
+    )
+    for post in posts:
+        category = category_index.get(post.category_id)
+        if category is not None:
+            post.category = category
+        location = location_index.get(post.location_id)
+        if location is not None:
+            post.location = location
+    return posts
@@ -0,0 +1,61 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_tags, post_tag
+from blog.models import Post
+from blog.uploads import inspect_image
+
+
+class Command(BaseCommand):
+    help = "Заполняет размеры и SHA-256 фото уже загруженных публикаций."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Сколько публикаций обрабатывать за один проход.",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Обработать только публикации без SHA-256 фото.",
+        )
+
+    def handle(self, *args, batch_size, missing, **options):
+        queryset = Post.objects.exclude(image="").only("pk", "image")
+        if missing:
+            queryset = queryset.filter(image_sha256="")
+        updated = failed = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk).order_by("pk")[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            measured = []
+            for post in batch:
+                try:
+                    with default_storage.open(post.image.name) as file:
+                        (
+                            post.image_width,
+                            post.image_height,
+                            post.image_sha256,
+                        ) = inspect_image(file)
+                except OSError:
+                    failed += 1
+                    continue
+                measured.append(post)
+            Post.objects.bulk_update(
+                measured, ("image_width", "image_height", "image_sha256")
+            )
+            # bulk_update skips post_save, so cached pages are dropped here.
+            invalidate_tags({post_tag(post.pk) for post in measured})
+            updated += len(measured)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Обновлено публикаций: {updated}, с ошибками: {failed}"
+            )
+        )
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_tags, post_tag
+from blog.models import Comment, Post
+from blog.text import render_excerpt, render_html
+
+
+def render_post(post):
+    post.excerpt = render_excerpt(post.text)
+    post.text_html = render_html(post.text)
+
+
+def render_comment(comment):
+    comment.text_html = render_html(comment.text)
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет анонсы и HTML-версии текстов публикаций и комментариев "
+        "порциями."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Сколько строк обрабатывать за один проход.",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Обработать только строки без HTML-версии текста.",
+        )
+
+    def handle(self, *args, batch_size, missing, **options):
+        posts = self.backfill(
+            Post.objects.only("pk", "text"),
+            render_post,
+            ("excerpt", "text_html"),
+            batch_size,
+            missing,
+        )
+        comments = self.backfill(
+            Comment.objects.only("pk", "post_id", "text"),
+            render_comment,
+            ("text_html",),
+            batch_size,
+            missing,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Обновлено публикаций: {posts}, комментариев: {comments}"
+            )
+        )
+
+    def backfill(self, queryset, render, fields, batch_size, missing):
+        if missing:
+            queryset = queryset.filter(text_html="").exclude(text="")
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk).order_by("pk")[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for row in batch:
+                render(row)
+            queryset.model.objects.bulk_update(batch, fields)
+            # bulk_update skips post_save, so cached pages are dropped here.
+            invalidate_tags({
+                post_tag(getattr(row, "post_id", row.pk)) for row in batch
+            })
+            updated += len(batch)
+        return updated
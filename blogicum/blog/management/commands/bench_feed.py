@@ -0,0 +1,82 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.lookups import attach_catalog
+from blog.models import Post
+from blogicum.constants import PAGE_NUM
+
+FEED_PATHS = (
+    (
+        "prefetch_related",
+        lambda size: list(
+            Post.objects.published().prefetch_related(
+                "category", "location", "author"
+            )[:size]
+        ),
+    ),
+    (
+        "for_feed",
+        lambda size: attach_catalog(
+            list(Post.objects.published().for_feed()[:size])
+        ),
+    ),
+)
+
+
+def load_page(fetch, size):
+    return [
+        (post.pk, post.author.username, post.category, post.location)
+        for post in fetch(size)
+    ]
+
+
+def measure(fetch, size, iterations):
+    # Warms the in-process category and location lookups.
+    load_page(fetch, size)
+    with CaptureQueriesContext(connection) as queries:
+        load_page(fetch, size)
+    tracemalloc.start()
+    load_page(fetch, size)
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocations = sum(stat.count for stat in snapshot.statistics("filename"))
+    started = time.perf_counter()
+    for _ in range(iterations):
+        load_page(fetch, size)
+    elapsed = (time.perf_counter() - started) / iterations
+    return len(queries), allocations, elapsed * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает число запросов, выделений памяти и время загрузки "
+        "страницы ленты для разных способов выборки публикаций."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=100,
+            help="Сколько раз загружать страницу для замера времени.",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=PAGE_NUM,
+            help="Количество публикаций на странице.",
+        )
+
+    def handle(self, *args, iterations, page_size, **options):
+        for name, fetch in FEED_PATHS:
+            queries, allocations, elapsed = measure(
+                fetch, page_size, iterations
+            )
+            self.stdout.write(
+                f"{name}: запросов {queries}, выделений памяти "
+                f"{allocations}, {elapsed:.2f} мс на страницу"
+            )
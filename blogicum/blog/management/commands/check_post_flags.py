@@ -0,0 +1,86 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from blog.models import Category, Location, Post
+from blog.signals import invalidate_posts
+
+
+class Command(BaseCommand):
+    help = (
+        "Проверяет, что скопированные в публикации признаки публикации "
+        "категорий и местоположений, а также видимость публикаций "
+        "совпадают с исходными данными."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Исправить найденные расхождения.",
+        )
+
+    def handle(self, *args, fix, **options):
+        checks = [
+            (
+                f"категория «{category.slug}»",
+                Post.objects.filter(category=category).exclude(
+                    category_is_published=category.is_published
+                ),
+                {"category_is_published": category.is_published},
+            )
+            for category in Category.objects.only("slug", "is_published")
+        ]
+        checks += [
+            (
+                f"местоположение #{location.pk}",
+                Post.objects.filter(location=location).exclude(
+                    location_is_published=location.is_published
+                ),
+                {"location_is_published": location.is_published},
+            )
+            for location in Location.objects.only("is_published")
+        ]
+        now = timezone.now()
+        checks += [
+            (
+                "публикации без категории",
+                Post.objects.filter(
+                    category__isnull=True, category_is_published=True
+                ),
+                {"category_is_published": False},
+            ),
+            (
+                "публикации без местоположения",
+                Post.objects.filter(
+                    location__isnull=True, location_is_published=True
+                ),
+                {"location_is_published": False},
+            ),
+            (
+                "видимые публикации, которые должны быть скрыты",
+                Post.objects.filter(is_visible=True).filter(
+                    Q(is_published=False) | Q(pub_date__gt=now)
+                ),
+                {"is_visible": False},
+            ),
+        ]
+        total = 0
+        for label, drifted, values in checks:
+            found = drifted.count()
+            if not found:
+                continue
+            total += found
+            self.stdout.write(f"{label}: расхождений {found}")
+            if fix:
+                post_ids = list(drifted.values_list("pk", flat=True))
+                Post.objects.filter(pk__in=post_ids).update(
+                    **values, updated_at=now
+                )
+                # The flags decide where the posts are listed, so their
+                # feeds are dropped along with the posts' own pages.
+                invalidate_posts(post_ids)
+        message = f"Всего расхождений: {total}"
+        if total and fix:
+            message += " (исправлено)"
+        self.stdout.write(self.style.SUCCESS(message))
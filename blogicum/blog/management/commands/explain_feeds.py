@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.query_plans import explain_hot_querysets
+
+
+class Command(BaseCommand):
+    help = (
+        "Выводит план выполнения (EXPLAIN QUERY PLAN) для запросов лент и "
+        "завершается ошибкой, если какой-то из них просматривает таблицу "
+        "целиком."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="Файл, в который нужно записать планы запросов.",
+        )
+
+    def handle(self, *args, output, **options):
+        report = []
+        failed = []
+        for name, plan, problems in explain_hot_querysets():
+            report.append(f"== {name}\n{plan}\n")
+            if problems:
+                failed.append(f"{name}: {', '.join(problems)}")
+        report = "\n".join(report)
+        if output:
+            with open(output, "w", encoding="utf-8") as file:
+                file.write(report)
+        else:
+            self.stdout.write(report)
+        if failed:
+            raise CommandError(
+                "Запросы без подходящего индекса:\n" + "\n".join(failed)
+            )
+        self.stdout.write(
+            self.style.SUCCESS("Все запросы лент используют индексы")
+        )
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from blog.images import build_in_worker, build_post_derivatives
+from blog.models import Post
+from blogicum.constants import IMAGE_WORKERS
+
+
+class Command(BaseCommand):
+    help = "Готовит уменьшенные копии фото публикаций в форматах WebP и JPEG."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=IMAGE_WORKERS,
+            help="Сколько изображений обрабатывать параллельно.",
+        )
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Обработать только публикации без уменьшенных копий.",
+        )
+
+    def handle(self, *args, workers, missing, **options):
+        posts = Post.objects.exclude(image="")
+        if missing:
+            posts = posts.filter(image_derivatives=[])
+        jobs = list(posts.order_by("pk").values_list("pk", "image"))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(build_in_worker, *job) for job in jobs
+                ]
+            failed = sum(future.exception() is not None for future in futures)
+        else:
+            failed = 0
+            for job in jobs:
+                try:
+                    build_post_derivatives(*job)
+                except Exception:
+                    failed += 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Обработано изображений: {len(jobs) - failed}, "
+                f"с ошибками: {failed}"
+            )
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import page_cache_stats, reset_page_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Показывает долю попаданий и время ответа кэша страниц."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Обнулить счётчики после вывода.",
+        )
+
+    def handle(self, *args, reset, **options):
+        stats = page_cache_stats()
+        self.stdout.write(
+            f"Попаданий: {stats['hits']}\n"
+            f"Промахов: {stats['misses']}\n"
+            f"Доля попаданий: {stats['hit_ratio']:.1%}\n"
+            f"Среднее время ответа из кэша: {stats['avg_hit_ms']:.2f} мс\n"
+            f"Среднее время ответа без кэша: {stats['avg_miss_ms']:.2f} мс"
+        )
+        if reset:
+            reset_page_cache_stats()
@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import Post
+from blog.signals import posts_published
+
+
+class Command(BaseCommand):
+    help = (
+        "Делает видимыми в лентах отложенные публикации, дата публикации "
+        "которых наступила."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить одну проверку и завершиться.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="Максимальная пауза между проверками, в секундах.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+        )
+
+    def handle(self, *args, once, interval, batch_size, **options):
+        while True:
+            published = self.publish_due(batch_size)
+            if published:
+                self.stdout.write(f"Опубликовано: {published}")
+            if once:
+                break
+            time.sleep(self.get_delay(interval))
+
+    def publish_due(self, batch_size):
+        published = 0
+        while True:
+            now = timezone.now()
+            due = Post.objects.filter(
+                is_visible=False, is_published=True, pub_date__lte=now
+            )
+            ids = list(
+                due.order_by("pub_date").values_list("pk", flat=True)[
+                    :batch_size
+                ]
+            )
+            if not ids:
+                return published
+            # The filter is repeated so posts rescheduled meanwhile stay
+            # hidden.
+            due.filter(pk__in=ids).update(is_visible=True, updated_at=now)
+            posts_published.send(sender=Post, post_ids=ids)
+            published += len(ids)
+
+    def get_delay(self, interval):
+        next_pub_date = (
+            Post.objects.filter(is_visible=False, is_published=True)
+            .order_by("pub_date")
+            .values_list("pub_date", flat=True)
+            .first()
+        )
+        if next_pub_date is None:
+            return interval
+        delay = (next_pub_date - timezone.now()).total_seconds()
+        return min(interval, max(delay, 0))
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from blog.cache import invalidate_tags, post_tag
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Сверяет сохранённое количество комментариев у публикаций с "
+        "фактическим и исправляет расхождения порциями."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Сколько публикаций проверять за один проход.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать расхождения, ничего не исправляя.",
+        )
+
+    def handle(self, *args, batch_size, dry_run, **options):
+        checked = fixed = 0
+        live_counts = (
+            Comment.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", "comment_count")[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            actual = dict(
+                Comment.objects.filter(
+                    post_id__gte=batch[0][0], post_id__lte=last_pk
+                )
+                .order_by()
+                .values_list("post_id")
+                .annotate(total=Count("pk"))
+            )
+            drift = {
+                pk: actual.get(pk, 0)
+                for pk, stored in batch
+                if stored != actual.get(pk, 0)
+            }
+            checked += len(batch)
+            for pk, total in drift.items():
+                self.stdout.write(f"Публикация {pk}: {total} комментариев")
+            if drift and not dry_run:
+                # Recount inside the UPDATE so comments added meanwhile
+                # are not lost.
+                Post.objects.filter(pk__in=drift).update(
+                    comment_count=Coalesce(Subquery(live_counts), 0),
+                    updated_at=timezone.now(),
+                )
+                invalidate_tags({post_tag(pk) for pk in drift})
+            fixed += len(drift)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Проверено публикаций: {checked}, расхождений: {fixed}"
+            )
+        )
@@ -1,18 +1,40 @@
 from django.db import models
 from django.db.models import Count
-from django.utils import timezone
 
+FEED_CARD_FIELDS = (
+    "id",
+    "title",
+    "excerpt",
+    "pub_date",
+    "image",
+    "image_width",
+    "image_height",
+    "image_derivatives",
+    "is_published",
+    "comment_count",
+    "category_is_published",
+    "location_is_published",
+    "author__username",
+    "category",
+    "location",
+)
 
-class PostManager(models.Manager):
-    def get_queryset(self):
+
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(is_visible=True, category_is_published=True)
+
+    def with_comment_count(self):
+        return self.annotate(comment_total=Count("comments"))
+
+    def for_feed(self):
         return (
-            super()
-            .get_queryset()
-            .filter(
-                pub_date__lte=timezone.now(),
-                is_published=True,
-                category__is_published=True,
-            )
-            .annotate(comment_count=Count("comments"))
-            .order_by("-pub_date")
+            self.select_related("author")
+            .only(*FEED_CARD_FIELDS)
+            .order_by("-pub_date", "-id")
         )
+
+
+class PostManager(models.Manager.from_queryset(PostQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().published().order_by("-pub_date")
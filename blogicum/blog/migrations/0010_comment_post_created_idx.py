@@ -0,0 +1,20 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0009_post_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "created_at", "id"],
+                name="comment_post_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:43
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_is_visible(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Post.objects.filter(
+        is_published=True, pub_date__lte=timezone.now()
+    ).update(is_visible=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0010_comment_post_created_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="post",
+            name="post_published_feed_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="post",
+            name="post_category_feed_idx",
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="is_visible",
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                help_text="Опубликована и дата публикации уже наступила.",
+                verbose_name="Видна в лентах",
+            ),
+        ),
+        migrations.RunPython(fill_is_visible, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_visible", True)),
+                fields=["-pub_date", "-id"],
+                name="post_visible_feed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_visible", True)),
+                fields=["category", "-pub_date", "-id"],
+                name="post_category_feed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_published", True), ("is_visible", False)
+                ),
+                fields=["pub_date"],
+                name="post_scheduled_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:44
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_published_flags(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Category = apps.get_model("blog", "Category")
+    Location = apps.get_model("blog", "Location")
+    Post.objects.update(
+        category_is_published=Coalesce(
+            Subquery(
+                Category.objects.filter(pk=OuterRef("category_id")).values(
+                    "is_published"
+                )
+            ),
+            False,
+        ),
+        location_is_published=Coalesce(
+            Subquery(
+                Location.objects.filter(pk=OuterRef("location_id")).values(
+                    "is_published"
+                )
+            ),
+            False,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0011_post_is_visible"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="post",
+            name="post_visible_feed_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="post",
+            name="post_category_feed_idx",
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="category_is_published",
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                verbose_name="Категория опубликована",
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="location_is_published",
+            field=models.BooleanField(
+                default=False,
+                editable=False,
+                verbose_name="Местоположение опубликовано",
+            ),
+        ),
+        migrations.RunPython(fill_published_flags, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(
+                    ("category_is_published", True), ("is_visible", True)
+                ),
+                fields=["-pub_date", "-id"],
+                name="post_visible_feed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(
+                    ("category_is_published", True), ("is_visible", True)
+                ),
+                fields=["category", "-pub_date", "-id"],
+                name="post_category_feed_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:50
+
+from blog.text import render_excerpt, render_html
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def render_in_batches(model, render, fields):
+    last_pk = 0
+    while True:
+        batch = list(
+            model.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", "text")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        for row in batch:
+            render(row)
+        model.objects.bulk_update(batch, fields)
+
+
+def render_post(post):
+    post.excerpt = render_excerpt(post.text)
+    post.text_html = render_html(post.text)
+
+
+def render_comment(comment):
+    comment.text_html = render_html(comment.text)
+
+
+def fill_rendered_text(apps, schema_editor):
+    render_in_batches(
+        apps.get_model("blog", "Post"), render_post, ("excerpt", "text_html")
+    )
+    render_in_batches(
+        apps.get_model("blog", "Comment"), render_comment, ("text_html",)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0012_post_published_flags"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="text_html",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="Текст в HTML"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="excerpt",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="Анонс"
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="text_html",
+            field=models.TextField(
+                blank=True, editable=False, verbose_name="Текст в HTML"
+            ),
+        ),
+        migrations.RunPython(fill_rendered_text, migrations.RunPython.noop),
+    ]
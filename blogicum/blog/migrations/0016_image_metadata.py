@@ -0,0 +1,44 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0015_image_derivatives"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="image_height",
+            field=models.PositiveIntegerField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Высота фото",
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="image_sha256",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=64,
+                verbose_name="SHA-256 фото",
+            ),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="image_width",
+            field=models.PositiveIntegerField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Ширина фото",
+            ),
+        ),
+    ]
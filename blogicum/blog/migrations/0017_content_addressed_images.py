@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-18 05:07
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("blog", "0016_image_metadata"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="post",
+            name="image",
+            field=models.ImageField(
+                blank=True,
+                storage=core.storage.ContentAddressedStorage(),
+                upload_to="posts_images",
+                verbose_name="Фото",
+            ),
+        ),
+    ]
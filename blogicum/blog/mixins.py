@@ -1,12 +1,167 @@
-from django.contrib.auth import get_user_model
+import re
+import time
+
+from django.conf import settings
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.shortcuts import get_object_or_404, redirect
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.http import Http404, HttpResponse
+from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
+from django.utils.text import compress_string
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+from blogicum.constants import COMMENTS_PAGE_NUM, PAGE_CACHE_TIMEOUT
 
+from .cache import (get_tag_versions, get_tagged, get_tagged_entry,
+                    peek_tagged, record_page_cache, set_tagged,
+                    single_flight, versions_etag, versions_last_modified,
+                    wait_for_tagged)
 from .forms import PostForm
+from .holes import fill_holes, punch_holes, strip_hole_marks
+from .lookups import attach_catalog
 from .models import Post
+from .paginators import CursorPaginator, FeedPaginator
+from .uploads import StreamingImageUploadHandler
+
+ACCEPTS_GZIP_RE = re.compile(r"\bgzip\b")
+
+
+class PageCacheMixin:
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+    donut = False
+
+    def is_page_shareable(self):
+        return True
+
+    def get_page_cache_base_tags(self):
+        return {self.get_feed_tag()}
+
+    def get_page_cache_tags(self, context):
+        tags = self.get_page_cache_base_tags()
+        for post in context.get("page_obj") or ():
+            tags |= post.cache_tags
+        return tags
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(**kwargs, donut=self.donut)
+
+    def uses_page_cache(self, request):
+        return request.method == "GET" and (
+            settings.PAGE_CACHE_AUTHENTICATED
+            or not request.user.is_authenticated
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.uses_page_cache(request):
+            return super().dispatch(request, *args, **kwargs)
+        self.donut = True
+        started = time.perf_counter()
+        key = f"page:{request.get_full_path()}"
+        entry, fresh = peek_tagged(key)
+        if fresh:
+            return self.cached_response(request, entry, "HIT", started)
+        with single_flight(key) as leader:
+            if leader:
+                entry = get_tagged_entry(key)
+            elif entry is None:
+                entry = wait_for_tagged(key)
+            else:
+                # Another worker is rebuilding the page: readers get the
+                # stale copy meanwhile instead of piling onto the database.
+                return self.cached_response(request, entry, "STALE", started)
+            if entry is not None:
+                return self.cached_response(request, entry, "HIT", started)
+            return self.render_page(request, key, started, *args, **kwargs)
+
+    def cached_response(self, request, entry, status, started):
+        versions, (content, content_type) = entry
+        compress = (
+            not request.user.is_authenticated
+            and ACCEPTS_GZIP_RE.search(
+                request.META.get("HTTP_ACCEPT_ENCODING", "")
+            )
+        )
+        response = HttpResponse(content_type=content_type)
+        if compress:
+            response["Content-Encoding"] = "gzip"
+        patch_vary_headers(response, ("Accept-Encoding",))
+        response["X-Page-Cache"] = status
+        # Validators come from the tag versions alone, so a 304 is sent
+        # before any hole is rendered or any byte compressed.
+        response = self.conditional_response(request, response, versions)
+        if response.status_code == 200:
+            response.content = (
+                self.get_compressed_page(request, content, versions)
+                if compress
+                else fill_holes(content, request)
+            )
+        record_page_cache(True, time.perf_counter() - started)
+        return response
+
+    def get_compressed_page(self, request, content, versions):
+        # Every anonymous reader gets the same filled page, so it is
+        # compressed once per version rather than once per response.
+        key = f"page-gzip:{request.get_full_path()}"
+        compressed = get_tagged(key)
+        if compressed is None:
+            compressed = compress_string(fill_holes(content, request))
+            set_tagged(
+                key, compressed, versions, self.page_cache_timeout, versions
+            )
+        return compressed
+
+    def render_page(self, request, key, started, *args, **kwargs):
+        # Stamped before rendering: an invalidation that lands while the
+        # page is being built leaves the stored copy already stale.
+        versions = get_tag_versions(self.get_page_cache_base_tags())
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        if response.status_code != 200 or response.streaming:
+            return response
+        content = response.content
+        response.content = strip_hole_marks(content)
+        if not self.is_page_shareable():
+            return response
+        versions = set_tagged(
+            key,
+            (punch_holes(content), response["Content-Type"]),
+            self.get_page_cache_tags(response.context_data),
+            self.page_cache_timeout,
+            versions,
+        )
+        response["X-Page-Cache"] = "MISS"
+        record_page_cache(False, time.perf_counter() - started)
+        return self.conditional_response(request, response, versions)
+
+    def conditional_response(self, request, response, versions):
+        user = request.user
+        response["ETag"] = versions_etag(
+            versions,
+            f"{user.pk}:{user.get_username()}:"
+            f"{response.get('Content-Encoding', '')}",
+        )
+        last_modified = versions_last_modified(versions)
+        response["Last-Modified"] = http_date(last_modified)
+        return get_conditional_response(
+            request,
+            etag=response["ETag"],
+            last_modified=last_modified,
+            response=response,
+        )
+
 
-User = get_user_model()
+@method_decorator(csrf_exempt, name="dispatch")
+class StreamingUploadMixin:
+    def dispatch(self, request, *args, **kwargs):
+        # The CSRF check reads request.POST, which parses the upload, so the
+        # handlers are swapped first and the check is run afterwards.
+        request.upload_handlers = [StreamingImageUploadHandler(request)]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
 
 
 class ProfileSuccessUrlMixin:
@@ -19,11 +174,46 @@ class ProfileSuccessUrlMixin:
         )
 
 
-class AuthorRequired(UserPassesTestMixin):
+class CachedObjectMixin:
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, "_cached_object"):
+            self._cached_object = super().get_object()
+        return self._cached_object
+
+
+class VisiblePostMixin(CachedObjectMixin):
+    pk_url_kwarg = "post_id"
+
+    def get_queryset(self):
+        return Post.objects.filter(
+            Q(is_published=True)
+            | Q(author__username=self.request.user.username)
+        )
+
+
+class CommentPageMixin:
+    comments_paginate_by = COMMENTS_PAGE_NUM
+    comments_ordering = ("created_at", "id")
+
+    def get_comments_page(self, post, cursor=None):
+        paginator = CursorPaginator(
+            post.comments.select_related("author"),
+            self.comments_paginate_by,
+            self.comments_ordering,
+        )
+        try:
+            return paginator.page(cursor)
+        except InvalidPage as error:
+            raise Http404(str(error))
+
+
+class AuthorRequired(CachedObjectMixin, UserPassesTestMixin):
     def test_func(self):
         return (
             self.request.user.is_authenticated
-            and self.request.user == self.get_object().author
+            and self.request.user.pk == self.get_object().author_id
         )
 
 
@@ -38,12 +228,48 @@ class PostFormValidMixin:
     form_class = PostForm
 
     def form_valid(self, form):
-        form.instance.author = get_object_or_404(
-            User, username=self.request.user.username
-        )
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
 class RedirectNoPermissionMixin(AuthorRequired):
     def handle_no_permission(self):
         return redirect("blog:post_detail", post_id=self.get_object().id)
+
+
+class CursorPaginationMixin:
+    paginator_class = FeedPaginator
+    cursor_kwarg = "cursor"
+    cursor_ordering = ("-pub_date", "-id")
+
+    def get_feed_tag(self):
+        return None
+
+    def get_paginator(self, *args, **kwargs):
+        return super().get_paginator(
+            *args, count_cache_tag=self.get_feed_tag(), **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        queryset = queryset.order_by(*self.cursor_ordering)
+        cursor_paginator = CursorPaginator(
+            queryset, page_size, self.cursor_ordering
+        )
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if cursor is None:
+            paginator, page, object_list, is_paginated = (
+                super().paginate_queryset(queryset, page_size)
+            )
+            page.next_cursor, page.previous_cursor = (
+                cursor_paginator.cursors_for_page(page)
+            )
+            page.object_list = attach_catalog(list(page.object_list))
+            return paginator, page, page.object_list, is_paginated
+        try:
+            page = cursor_paginator.page(cursor)
+        except InvalidPage as error:
+            raise Http404(str(error))
+        attach_catalog(page.object_list)
+        return (
+            cursor_paginator, page, page.object_list, page.has_other_pages()
+        )
@@ -1,7 +1,12 @@
-from blog.managers import PostManager
+from blog.cache import author_tag, category_tag, location_tag, post_tag
+from blog.managers import PostManager, PostQuerySet
+from blog.text import render_excerpt, render_html
+from blog.uploads import inspect_image
 from core.models import BlogBaseModel
+from core.storage import ContentAddressedStorage
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 from blogicum.constants import MAX_LENGTH, TITLE
 
@@ -30,6 +35,15 @@ class Category(BlogBaseModel):
     def __str__(self):
         return f"{self.title[:MAX_LENGTH]} | {self.description} | {self.slug}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.posts.exclude(
+            category_is_published=self.is_published
+        ).update(
+            category_is_published=self.is_published,
+            updated_at=timezone.now(),
+        )
+
 
 class Location(BlogBaseModel):
     name = models.CharField("Название места", max_length=MAX_LENGTH)
@@ -41,6 +55,15 @@ class Location(BlogBaseModel):
     def __str__(self):
         return f"{self.name[:MAX_LENGTH]}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.posts.exclude(
+            location_is_published=self.is_published
+        ).update(
+            location_is_published=self.is_published,
+            updated_at=timezone.now(),
+        )
+
 
 class Post(BlogBaseModel):
     title = models.CharField(
@@ -78,20 +101,173 @@ class Post(BlogBaseModel):
     image = models.ImageField(
         "Фото",
         upload_to="posts_images",
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    comment_count = models.PositiveIntegerField(
+        "Количество комментариев",
+        default=0,
+        editable=False,
+    )
+    category_is_published = models.BooleanField(
+        "Категория опубликована",
+        default=False,
+        editable=False,
+    )
+    location_is_published = models.BooleanField(
+        "Местоположение опубликовано",
+        default=False,
+        editable=False,
+    )
+    is_visible = models.BooleanField(
+        "Видна в лентах",
+        default=False,
+        editable=False,
+        help_text="Опубликована и дата публикации уже наступила.",
+    )
+    excerpt = models.TextField(
+        "Анонс",
+        blank=True,
+        editable=False,
+    )
+    text_html = models.TextField(
+        "Текст в HTML",
+        blank=True,
+        editable=False,
+    )
+    image_width = models.PositiveIntegerField(
+        "Ширина фото",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    image_height = models.PositiveIntegerField(
+        "Высота фото",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    image_sha256 = models.CharField(
+        "SHA-256 фото",
+        max_length=64,
+        blank=True,
+        editable=False,
+        db_index=True,
+    )
+    image_derivatives = models.JSONField(
+        "Ширины уменьшенных копий фото",
+        default=list,
+        blank=True,
+        editable=False,
+    )
 
-    objects = models.Manager()
+    objects = PostQuerySet.as_manager()
     published_posts = PostManager()
 
     class Meta:
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
         ordering = ("-pub_date",)
+        indexes = (
+            models.Index(
+                fields=("-pub_date", "-id"),
+                condition=models.Q(
+                    is_visible=True, category_is_published=True
+                ),
+                name="post_visible_feed_idx",
+            ),
+            models.Index(
+                fields=("category", "-pub_date", "-id"),
+                condition=models.Q(
+                    is_visible=True, category_is_published=True
+                ),
+                name="post_category_feed_idx",
+            ),
+            models.Index(
+                fields=("pub_date",),
+                condition=models.Q(is_visible=False, is_published=True),
+                name="post_scheduled_idx",
+            ),
+            models.Index(
+                fields=("author", "-pub_date", "-id"),
+                name="post_author_feed_idx",
+            ),
+        )
 
     def __str__(self):
         return f"{self.title[:MAX_LENGTH]} | {self.text}"
 
+    @property
+    def cache_tags(self):
+        tags = {post_tag(self.pk), author_tag(self.author.username)}
+        if self.category_id:
+            tags.add(category_tag(self.category.slug))
+        if self.location_id:
+            tags.add(location_tag(self.location_id))
+        return tags
+
+    def save(self, *args, **kwargs):
+        self.is_visible = (
+            self.is_published and self.pub_date <= timezone.now()
+        )
+        self.category_is_published = bool(
+            self.category and self.category.is_published
+        )
+        self.location_is_published = bool(
+            self.location and self.location.is_published
+        )
+        self.excerpt = render_excerpt(self.text)
+        self.text_html = render_html(self.text)
+        if not self.image:
+            self.image_width = self.image_height = None
+            self.image_sha256 = ""
+        elif not self.image._committed:
+            # A fresh upload: measured and hashed in the same single read.
+            self.image_width, self.image_height, self.image_sha256 = (
+                inspect_image(self.image.file)
+            )
+            self.image.file.sha256 = self.image_sha256
+        stored_image = (
+            type(self)._default_manager.filter(pk=self.pk)
+            .values_list("image", flat=True)
+            .first()
+            if self.pk is not None else None
+        )
+        self._image_changed = (self.image.name or "") != (stored_image or "")
+        if self._image_changed:
+            self.image_derivatives = []
+        update_fields = kwargs.get("update_fields")
+        if (
+            update_fields is None
+            and stored_image is not None
+            and not self._image_changed
+            and not kwargs.get("force_insert")
+        ):
+            # The comment counter and the derivative widths are changed by
+            # UPDATEs of their own (comment signals, the image worker) and
+            # may be newer than this instance, so they are left out.
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in ("comment_count", "image_derivatives")
+            ]
+        if update_fields is not None:
+            if self._image_changed:
+                update_fields = {*update_fields, "image_derivatives"}
+            kwargs["update_fields"] = {
+                *update_fields,
+                "is_visible",
+                "category_is_published",
+                "location_is_published",
+                "excerpt",
+                "text_html",
+                "image_width",
+                "image_height",
+                "image_sha256",
+                "updated_at",
+            }
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     text = models.TextField(
@@ -105,7 +281,32 @@ class Comment(models.Model):
     created_at = models.DateTimeField(
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE
     )
+    text_html = models.TextField(
+        "Текст в HTML",
+        blank=True,
+        editable=False,
+    )
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=("post", "created_at", "id"),
+                name="comment_post_created_idx",
+            ),
+        )
+
+    def save(self, *args, **kwargs):
+        self.text_html = render_html(self.text)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {
+                *update_fields, "text_html", "updated_at"
+            }
+        super().save(*args, **kwargs)
@@ -0,0 +1,241 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, InvalidPage, Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from blogicum.constants import (FEED_COUNT_CACHE_TIMEOUT,
+                                FEED_EXACT_COUNT_LIMIT)
+
+from .cache import get_or_set_tagged
+
+AFTER = "a"
+BEFORE = "b"
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPage:
+    number = None
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<Cursor page of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    count_is_exact = False
+
+    def __init__(self, object_list, per_page, ordering=("-pub_date", "-id")):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip("-") for name in self.ordering]
+        self.descending = [name.startswith("-") for name in self.ordering]
+
+    def encode_cursor(self, obj, direction):
+        values = [
+            self._get_model_field(name).value_to_string(obj)
+            for name in self.fields
+        ]
+        raw = json.dumps([direction, values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            direction, values = json.loads(
+                base64.urlsafe_b64decode(padded.encode())
+            )
+            if direction not in (AFTER, BEFORE):
+                raise ValueError
+            if len(values) != len(self.fields):
+                raise ValueError
+            values = [
+                self._get_model_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise InvalidCursor("Некорректный курсор")
+        return direction, values
+
+    def page(self, cursor=None):
+        if not cursor:
+            return self._page_after(None)
+        direction, values = self.decode_cursor(cursor)
+        if direction == AFTER:
+            return self._page_after(values)
+        return self._page_before(values)
+
+    def cursors_for_page(self, page):
+        if not len(page):
+            return None, None
+        next_cursor = previous_cursor = None
+        if page.has_next():
+            next_cursor = self.encode_cursor(page[len(page) - 1], AFTER)
+        if page.has_previous():
+            previous_cursor = self.encode_cursor(page[0], BEFORE)
+        return next_cursor, previous_cursor
+
+    def _page_after(self, values):
+        queryset = self.object_list.order_by(*self.ordering)
+        if values is not None:
+            queryset = queryset.filter(self.seek(values, reverse=False))
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return CursorPage(
+            rows,
+            self,
+            next_cursor=(
+                self.encode_cursor(rows[-1], AFTER) if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(rows[0], BEFORE)
+                if values is not None and rows else None
+            ),
+        )
+
+    def _page_before(self, values):
+        reversed_ordering = [
+            name if descending else f"-{name}"
+            for name, descending in zip(self.fields, self.descending)
+        ]
+        queryset = self.object_list.order_by(*reversed_ordering).filter(
+            self.seek(values, reverse=True)
+        )
+        rows = list(queryset[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        return CursorPage(
+            rows,
+            self,
+            next_cursor=self.encode_cursor(rows[-1], AFTER) if rows else None,
+            previous_cursor=(
+                self.encode_cursor(rows[0], BEFORE) if has_previous else None
+            ),
+        )
+
+    def seek(self, values, reverse):
+        def lookup(descending):
+            return "gt" if descending == reverse else "lt"
+
+        condition = Q()
+        equal = Q()
+        for name, descending, value in zip(
+            self.fields, self.descending, values
+        ):
+            condition |= equal & Q(
+                **{f"{name}__{lookup(descending)}": value}
+            )
+            equal &= Q(**{name: value})
+        # Bound on the leading column lets the database seek on the index
+        # instead of walking it from the top.
+        leading = self.fields[0]
+        bound = f"{leading}__{lookup(self.descending[0])}e"
+        return Q(**{bound: values[0]}) & condition
+
+    def _get_model_field(self, name):
+        return self.object_list.model._meta.get_field(name)
+
+
+class FeedPage(Page):
+    has_more = None
+
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=self.paginator.on_each_side,
+            on_ends=self.paginator.on_ends,
+        )
+
+    def has_next(self):
+        if self.has_more is not None:
+            return self.has_more
+        return super().has_next()
+
+
+class FeedPaginator(Paginator):
+    count_timeout = FEED_COUNT_CACHE_TIMEOUT
+    exact_count_limit = FEED_EXACT_COUNT_LIMIT
+    on_each_side = 2
+    on_ends = 1
+
+    def __init__(self, *args, count_cache_tag=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_tag = count_cache_tag
+
+    @cached_property
+    def count(self):
+        if self.count_cache_tag is None:
+            return self._bounded_count()
+        return get_or_set_tagged(
+            f"feed-count:{self.count_cache_tag}",
+            self._bounded_count,
+            [self.count_cache_tag],
+            self.count_timeout,
+        )
+
+    @cached_property
+    def count_is_exact(self):
+        return self.count <= self.exact_count_limit
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.count_is_exact or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        if self.count_is_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not object_list and number > 1:
+            raise EmptyPage("Страница не содержит результатов")
+        page = self._get_page(object_list[:self.per_page], number, self)
+        page.has_more = len(object_list) > self.per_page
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+    def _bounded_count(self):
+        # Past the limit the exact figure is not worth a full COUNT(*):
+        # the paginator falls back to previous/next navigation.
+        return self.object_list.order_by()[
+            :self.exact_count_limit + 1
+        ].count()
@@ -0,0 +1,54 @@
+import re
+
+from django.utils import timezone
+
+from blogicum.constants import PAGE_NUM
+
+from .models import Post
+from .paginators import CursorPaginator
+
+FULL_SCAN_RE = re.compile(r"\bSCAN (?:TABLE )?(\w+)(?!\w| USING)")
+TEMP_SORT_RE = re.compile(r"USE TEMP B-TREE FOR ORDER BY")
+FEED_ORDERING = ("-pub_date", "-id")
+
+
+def hot_feeds():
+    # The same filters as PostListView, CategoryListView and
+    # ProfileDetailView, with placeholder values.
+    return (
+        ("index", Post.objects.published()),
+        ("category", Post.objects.published().filter(category_id=0)),
+        ("profile", Post.objects.filter(author__username="plan")),
+    )
+
+
+def hot_querysets():
+    for name, posts in hot_feeds():
+        queryset = posts.for_feed().order_by(*FEED_ORDERING)
+        paginator = CursorPaginator(queryset, PAGE_NUM, FEED_ORDERING)
+        limit = paginator.per_page + 1
+        yield name, queryset[:limit]
+        yield f"{name} (cursor)", queryset.filter(
+            paginator.seek((timezone.now(), 0), reverse=False)
+        )[:limit]
+    yield "scheduled", Post.objects.filter(
+        is_visible=False, is_published=True, pub_date__lte=timezone.now()
+    ).order_by("pub_date")
+
+
+def plan_problems(plan):
+    problems = [
+        f"полный просмотр таблицы {table}"
+        for table in FULL_SCAN_RE.findall(plan)
+    ]
+    if TEMP_SORT_RE.search(plan):
+        problems.append("сортировка во временном B-дереве")
+    return problems
+
+
+def explain_hot_querysets():
+    return [
+        (name, plan, plan_problems(plan))
+        for name, queryset in hot_querysets()
+        for plan in (queryset.explain(),)
+    ]
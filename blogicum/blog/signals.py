@@ -0,0 +1,142 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .cache import (INDEX_TAG, author_tag, category_tag, invalidate_tags,
+                    location_tag, post_tag)
+from .images import schedule_derivatives
+from .lookups import categories, locations
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+posts_published = Signal()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F("comment_count") + 1,
+            updated_at=timezone.now(),
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id).update(
+        comment_count=Greatest(F("comment_count") - 1, 0),
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(pre_delete, sender=Category)
+def hide_posts_of_deleted_category(sender, instance, **kwargs):
+    instance.posts.update(
+        category_is_published=False, updated_at=timezone.now()
+    )
+
+
+@receiver(pre_delete, sender=Location)
+def hide_location_of_posts(sender, instance, **kwargs):
+    instance.posts.update(
+        location_is_published=False, updated_at=timezone.now()
+    )
+
+
+def _previous_value(sender, instance, field):
+    if instance.pk is None:
+        return None
+    return (
+        sender._default_manager.filter(pk=instance.pk)
+        .values_list(field, flat=True)
+        .first()
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_category(sender, instance, **kwargs):
+    instance._previous_category_slug = _previous_value(
+        sender, instance, "category__slug"
+    )
+
+
+@receiver(post_save, sender=Post)
+def build_image_derivatives(sender, instance, **kwargs):
+    if getattr(instance, "_image_changed", False) and instance.image:
+        schedule_derivatives(instance.pk, instance.image.name)
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_slug(sender, instance, **kwargs):
+    instance._previous_slug = _previous_value(sender, instance, "slug")
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, **kwargs):
+    instance._previous_username = _previous_value(
+        sender, instance, "username"
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    tags = instance.cache_tags | {INDEX_TAG}
+    previous_slug = getattr(instance, "_previous_category_slug", None)
+    if previous_slug:
+        tags.add(category_tag(previous_slug))
+    invalidate_tags(tags)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post(sender, instance, **kwargs):
+    invalidate_tags([post_tag(instance.post_id)])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    tags = {INDEX_TAG, category_tag(instance.slug), categories.tag}
+    previous_slug = getattr(instance, "_previous_slug", None)
+    if previous_slug:
+        tags.add(category_tag(previous_slug))
+    invalidate_tags(tags)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location(sender, instance, **kwargs):
+    invalidate_tags([location_tag(instance.pk), locations.tag])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author(sender, instance, **kwargs):
+    tags = {author_tag(instance.username)}
+    previous_username = getattr(instance, "_previous_username", None)
+    if previous_username:
+        tags.add(author_tag(previous_username))
+    invalidate_tags(tags)
+
+
+def invalidate_posts(post_ids):
+    tags = {INDEX_TAG}
+    rows = Post.objects.filter(pk__in=post_ids).values_list(
+        "pk", "category__slug", "author__username"
+    )
+    for pk, slug, username in rows:
+        tags.update((post_tag(pk), author_tag(username)))
+        if slug:
+            tags.add(category_tag(slug))
+    invalidate_tags(tags)
+
+
+@receiver(posts_published)
+def invalidate_published_posts(sender, post_ids, **kwargs):
+    invalidate_posts(post_ids)
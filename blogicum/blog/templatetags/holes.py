@@ -0,0 +1,10 @@
+from django import template
+
+from blog.holes import render_hole_in
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, name, **args):
+    return render_hole_in(context, name, args)
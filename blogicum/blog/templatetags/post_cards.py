@@ -0,0 +1,21 @@
+from django import template
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.cache import get_or_set_tagged
+from blogicum.constants import POST_CARD_CACHE_TIMEOUT
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    # Rendered with the post alone, so nothing tied to the current user
+    # can end up in the shared fragment.
+    html = get_or_set_tagged(
+        f"post-card:{post.pk}",
+        lambda: render_to_string("includes/post_card.html", {"post": post}),
+        post.cache_tags,
+        POST_CARD_CACHE_TIMEOUT,
+    )
+    return mark_safe(html)
@@ -0,0 +1,13 @@
+from django import template
+
+from blog.images import derivative_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_srcset(post, extension):
+    return ", ".join(
+        f"{derivative_url(post.image.name, width, extension)} {width}w"
+        for width in post.image_derivatives
+    )
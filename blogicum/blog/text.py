@@ -0,0 +1,12 @@
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+from blogicum.constants import EXCERPT_WORDS
+
+
+def render_excerpt(text):
+    return Truncator(text).words(EXCERPT_WORDS, truncate=" …")
+
+
+def render_html(text):
+    return linebreaksbr(text, autoescape=True)
@@ -0,0 +1,141 @@
+import hashlib
+from io import BytesIO
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+from blogicum.constants import (IMAGE_HEADER_LIMIT, IMAGE_MAX_PIXELS,
+                                IMAGE_MAX_UPLOAD_SIZE)
+
+
+def read_header(file):
+    # Image.open only parses the header; the bitmap is never decoded.
+    # Image.DecompressionBombError is left to the caller: the file is a
+    # valid image, just one too large to accept.
+    try:
+        with Image.open(file) as image:
+            return image.size, image.format
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+
+def read_whole(file):
+    # Some formats (WebP) can only be opened from the complete stream;
+    # the upload size limit bounds what this reads.
+    file.seek(0)
+    try:
+        return read_header(file)
+    finally:
+        file.seek(0)
+
+
+class HeaderReader:
+    def __init__(self):
+        self.header = b""
+        self.result = None
+        self.too_large = False
+
+    @property
+    def done(self):
+        return (
+            self.result is not None
+            or self.too_large
+            or len(self.header) >= IMAGE_HEADER_LIMIT
+        )
+
+    def feed(self, chunk):
+        if self.done:
+            return
+        self.header += chunk[:IMAGE_HEADER_LIMIT - len(self.header)]
+        try:
+            self.result = read_header(BytesIO(self.header))
+        except Image.DecompressionBombError:
+            self.too_large = True
+
+
+def inspect_image(file):
+    if getattr(file, "sha256", None):
+        return file.image_width, file.image_height, file.sha256
+    digest = hashlib.sha256()
+    reader = HeaderReader()
+    for chunk in file.chunks():
+        digest.update(chunk)
+        reader.feed(chunk)
+    try:
+        result = reader.result or read_whole(file)
+    except Image.DecompressionBombError:
+        result = None
+    size = result[0] if result else (None, None)
+    return (*size, digest.hexdigest())
+
+
+class StreamingImageUploadHandler(FileUploadHandler):
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = TemporaryUploadedFile(
+            self.file_name, self.content_type, 0, self.charset,
+            self.content_type_extra,
+        )
+        self.digest = hashlib.sha256()
+        self.reader = HeaderReader()
+        self.error = None
+
+    def reject(self, message):
+        self.error = message
+        # Nothing more is written, and what was is given back to the disk.
+        self.file.seek(0)
+        self.file.truncate()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.error:
+            return None
+        if start + len(raw_data) > IMAGE_MAX_UPLOAD_SIZE:
+            self.reject(
+                "Размер файла превышает "
+                f"{filesizeformat(IMAGE_MAX_UPLOAD_SIZE)}."
+            )
+            return None
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+        if not self.reader.done:
+            self.reader.feed(raw_data)
+            if self.reader.too_large:
+                self.reject_too_large()
+            elif self.reader.result:
+                self.check_header(*self.reader.result)
+        return None
+
+    def reject_too_large(self):
+        self.reject(
+            "Изображение слишком большое: не более "
+            f"{IMAGE_MAX_PIXELS // 1_000_000} Мпикс."
+        )
+
+    def check_header(self, size, image_format):
+        width, height = size
+        if width * height > IMAGE_MAX_PIXELS:
+            self.reject_too_large()
+            return
+        self.file.image_width = width
+        self.file.image_height = height
+        self.file.image_format = image_format
+
+    def file_complete(self, file_size):
+        if self.error is None and self.reader.result is None:
+            try:
+                result = read_whole(self.file)
+            except Image.DecompressionBombError:
+                self.reject_too_large()
+            else:
+                if result:
+                    self.check_header(*result)
+                else:
+                    self.reject("Загрузите корректное изображение.")
+        self.file.seek(0)
+        self.file.upload_error = self.error
+        if self.error is None:
+            self.file.size = file_size
+            self.file.sha256 = self.digest.hexdigest()
+        return self.file
@@ -15,6 +15,16 @@ post_urls = [
         views.PostDetailView.as_view(),
         name="post_detail"
     ),
+    path(
+        "<int:post_id>/comments/",
+        views.PostCommentsView.as_view(),
+        name="post_comments"
+    ),
+    path(
+        "<int:post_id>/comment_form/",
+        views.CommentFormView.as_view(),
+        name="comment_form"
+    ),
     path(
         "<int:post_id>/edit/",
         views.PostUpdateView.as_view(),
@@ -1,50 +1,102 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Q
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
-                                  UpdateView)
+                                  TemplateView, UpdateView)
 
 from blogicum.constants import PAGE_NUM
 
+from .cache import INDEX_TAG, author_tag, category_tag, post_tag
 from .forms import CommentForm, PostForm, ProfileForm
-from .mixins import (AuthorRequiredAndPostSuccessUrlMixin, PostFormValidMixin,
-                     ProfileSuccessUrlMixin, RedirectNoPermissionMixin)
-from .models import Category, Comment, Post, User
-
-
-class PostDetailView(DetailView):
+from .lookups import categories
+from .mixins import (AuthorRequiredAndPostSuccessUrlMixin, CommentPageMixin,
+                     CursorPaginationMixin, PageCacheMixin,
+                     PostFormValidMixin, ProfileSuccessUrlMixin,
+                     RedirectNoPermissionMixin, StreamingUploadMixin,
+                     VisiblePostMixin)
+from .models import Comment, Post, User
+
+
+class PostDetailView(
+    PageCacheMixin,
+    VisiblePostMixin,
+    CommentPageMixin,
+    DetailView
+):
     template_name = "blog/detail.html"
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(
-            Post,
-            Q(id=self.kwargs["post_id"]),
-            (Q(is_published=True)
-             | Q(author__username=self.request.user.username)
-             )
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            "author",
+            "category",
+            "location"
         )
 
+    def get_page_cache_base_tags(self):
+        return {post_tag(self.kwargs["post_id"])}
+
+    def is_page_shareable(self):
+        # An author may preview an unpublished post; that page is theirs.
+        return self.object.is_published
+
+    def get_page_cache_tags(self, context):
+        return self.object.cache_tags | {
+            author_tag(comment.author.username)
+            for comment in context["comments"]
+        }
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
-        context["comments"] = self.get_object().comments.order_by("created_at")
+        context["comments"] = self.get_comments_page(self.object)
+        context["comment_form_fragment"] = settings.COMMENT_FORM_FRAGMENT
+        return context
+
+
+@method_decorator(never_cache, name="dispatch")
+class CommentFormView(TemplateView):
+    template_name = "includes/comment_form.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["form"] = CommentForm()
+        return context
+
+
+class PostCommentsView(VisiblePostMixin, CommentPageMixin, DetailView):
+    template_name = "includes/comment_list.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["comments"] = self.get_comments_page(
+            self.object,
+            self.request.GET.get("cursor")
+        )
         return context
 
 
-class PostListView(ListView):
+class PostListView(
+    PageCacheMixin,
+    CursorPaginationMixin,
+    ListView
+):
     paginate_by = PAGE_NUM
     template_name = "blog/index.html"
 
+    def get_feed_tag(self):
+        return INDEX_TAG
+
     def get_queryset(self):
-        return Post.published_posts.prefetch_related(
-            "category",
-            "location",
-            "author"
-        )
+        return Post.objects.published().for_feed()
 
 
 class PostCreateView(
+    StreamingUploadMixin,
     LoginRequiredMixin,
     PostFormValidMixin,
     ProfileSuccessUrlMixin,
@@ -54,6 +106,7 @@ class PostCreateView(
 
 
 class PostUpdateView(
+    StreamingUploadMixin,
     RedirectNoPermissionMixin,
     PostFormValidMixin,
     LoginRequiredMixin,
@@ -74,14 +127,15 @@ class PostDeleteView(
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["form"] = PostForm(instance=get_object_or_404(
-            Post,
-            pk=self.kwargs.get("post_id")
-        ))
+        context["form"] = PostForm(instance=self.object)
         return context
 
 
-class ProfileDetailView(ListView):
+class ProfileDetailView(
+    PageCacheMixin,
+    CursorPaginationMixin,
+    ListView
+):
     model = User
     template_name = "blog/profile.html"
     paginate_by = PAGE_NUM
@@ -92,11 +146,13 @@ class ProfileDetailView(ListView):
             username=self.kwargs["username"]
         )
 
+    def get_feed_tag(self):
+        return author_tag(self.kwargs["username"])
+
     def get_queryset(self):
         return Post.objects.filter(
-            Q(author__username=self.kwargs["username"])
-        ).annotate(comment_count=Count("comments")
-        ).order_by("-pub_date")
+            author__username=self.kwargs["username"]
+        ).for_feed()
 
     def get_context_data(self, **kwargs):
         return dict(
@@ -117,40 +173,49 @@ class ProfileUpdateView(ProfileSuccessUrlMixin, UpdateView,
             return self.request.user
 
 
-class CategoryListView(ListView):
+class CategoryListView(
+    PageCacheMixin,
+    CursorPaginationMixin,
+    ListView
+):
     model = Post
     template_name = "blog/category.html"
     paginate_by = PAGE_NUM
+    category = None
+
+    def get_feed_tag(self):
+        return category_tag(self.kwargs["category_slug"])
+
+    def get_category(self):
+        if self.category is None:
+            category = categories.get(slug=self.kwargs["category_slug"])
+            if category is None or not category.is_published:
+                raise Http404("Категория не найдена")
+            self.category = category
+        return self.category
 
     def get_queryset(self):
-        return Post.published_posts.filter(
-            category__slug=self.kwargs["category_slug"]
-        )
+        return Post.objects.published().filter(
+            category=self.get_category()
+        ).for_feed()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        category = get_object_or_404(
-            Category,
-            Q(slug=self.kwargs["category_slug"]) & Q(is_published=True)
-        )
-        context["category"] = category
+        context["category"] = self.get_category()
         return context
 
 
-class AddCommentView(CreateView, LoginRequiredMixin):
+class AddCommentView(LoginRequiredMixin, CreateView):
     model = Comment
     form_class = CommentForm
     template_name = "blog/comment.html"
 
+    @transaction.atomic
     def form_valid(self, form):
-        post_id = self.kwargs["post_id"]
-        form.instance.author = get_object_or_404(
-            User,
-            username=self.request.user.username
-        )
+        form.instance.author = self.request.user
         form.instance.post = get_object_or_404(
             Post,
-            pk=post_id
+            pk=self.kwargs["post_id"]
         )
         return super().form_valid(form)
 
@@ -177,15 +242,15 @@ class DeleteCommentView(
     DeleteView,
     LoginRequiredMixin
 ):
+    model = Comment
     template_name = "blog/comment.html"
-
-    def get_object(self, queryset=None):
-        return get_object_or_404(
-            Comment,
-            id=self.kwargs.get("comment_id"),
-        )
+    pk_url_kwarg = "comment_id"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = None
         return context
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
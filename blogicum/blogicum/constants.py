@@ -3,3 +3,19 @@ TITLE = "Заголовок"
 MAX_LENGTH_TITLE = 256
 SPLIT = 5
 PAGE_NUM = 10
+COMMENTS_PAGE_NUM = 50
+FEED_COUNT_CACHE_TIMEOUT = 60
+FEED_EXACT_COUNT_LIMIT = 10_000
+PAGE_CACHE_TIMEOUT = 300
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+EXCERPT_WORDS = 10
+SINGLE_FLIGHT_LOCK_TIMEOUT = 10
+SINGLE_FLIGHT_WAIT = 0.5
+SINGLE_FLIGHT_POLL = 0.05
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 960)
+IMAGE_WORKERS = 2
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+MEDIA_RANGE_CHUNK = 64 * 1024
+IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+IMAGE_MAX_PIXELS = 40_000_000
+IMAGE_HEADER_LIMIT = 256 * 1024
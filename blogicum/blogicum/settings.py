@@ -1,3 +1,4 @@
+import tempfile
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -64,6 +65,36 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    # Tag versions, cached pages and cards, the category and location
+    # lookup versions and the single-flight locks only work when every web
+    # worker and every management command (publish_scheduled, the repair
+    # and backfill commands) sees the same cache, so it must be shared
+    # between processes. The file backend does that on a single host. In
+    # production point it at Redis or Memcached: they also serve several
+    # hosts, and their add(), which the locks rely on, is atomic.
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": Path(tempfile.gettempdir()) / "blogicum-cache",
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
+    # Page cache counters are written by every server process and read by
+    # `manage.py page_cache_stats`. Point this at Redis or Memcached too:
+    # their increments are atomic, the file backend's are not.
+    "page_stats": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": Path(tempfile.gettempdir()) / "blogicum-page-stats",
+        "TIMEOUT": None,
+    },
+}
+
+# Serve cached page bodies to logged-in users as well, with their header,
+# comment form and edit links filled in per request.
+PAGE_CACHE_AUTHENTICATED = False
+# Load the comment form (and its CSRF token) with a separate request, so the
+# post page itself holds nothing user-specific.
+COMMENT_FORM_FRAGMENT = False
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -111,4 +142,11 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Header that hands media delivery over to the front proxy:
+# "X-Accel-Redirect" (nginx) or "X-Sendfile" (Apache, lighttpd). Without one
+# Django sends the files itself.
+MEDIA_SENDFILE_HEADER = None
+# Internal nginx location aliased to MEDIA_ROOT, for X-Accel-Redirect.
+MEDIA_ACCEL_REDIRECT_LOCATION = "/protected-media/"
+
 CSRF_FAILURE_VIEW = "pages.views.csrf_failure"
@@ -1,8 +1,10 @@
+import re
+
+from core.views import serve_media
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
-from django.urls import include, path, reverse_lazy
+from django.urls import include, path, re_path, reverse_lazy
 from django.views.generic.edit import CreateView
 
 auth_urls = [
@@ -32,4 +34,12 @@ if settings.DEBUG:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# MEDIA_URL is the site root, so only paths with a file extension are taken:
+# the rest still get APPEND_SLASH redirects.
+urlpatterns += (
+    re_path(
+        rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.+\.\w+)$",
+        serve_media,
+        name="media",
+    ),
+)
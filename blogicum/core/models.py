@@ -11,6 +11,10 @@ class BlogBaseModel(models.Model):
         "Добавлено",
         auto_now_add=True,
     )
+    updated_at = models.DateTimeField(
+        "Изменено",
+        auto_now=True,
+    )
 
     class Meta:
         abstract = True
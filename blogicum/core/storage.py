@@ -0,0 +1,54 @@
+import hashlib
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+IMMUTABLE_NAME_RE = re.compile(
+    r"(?:^|/)([0-9a-f]{2})/([0-9a-f]{2})/(?:derivatives/)?"
+    r"\1\2[0-9a-f]{60}(?:-\d+w)?\.\w+$"
+)
+
+
+def file_sha256(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_immutable(name):
+    return IMMUTABLE_NAME_RE.search(name) is not None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def content_name(self, name, content):
+        # Uploads that already know their hash skip a second read.
+        digest = getattr(content, "sha256", None) or file_sha256(content)
+        return posixpath.join(
+            posixpath.dirname(name),
+            digest[:2],
+            digest[2:4],
+            digest + posixpath.splitext(name)[1].lower(),
+        )
+
+    def get_available_name(self, name, max_length=None):
+        # The name is the content: a file already there is this very upload
+        # and is reused, never stored again under a suffixed name.
+        if self.exists(name):
+            raise FileExistsError(name)
+        return name
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        try:
+            return super().save(name, content, max_length)
+        except FileExistsError:
+            # Also raised from _save when an identical upload won the race
+            # between the existence check and the write.
+            return name
@@ -0,0 +1,121 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from blogicum.constants import MEDIA_IMMUTABLE_MAX_AGE, MEDIA_RANGE_CHUNK
+
+from .storage import is_immutable
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    match = RANGE_RE.match(header.strip())
+    if match is None or match.groups() == ("", ""):
+        # Several ranges or another unit: the whole file is a valid reply.
+        return None
+    start, end = match.groups()
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end or size - 1), size - 1)
+    if start > end:
+        raise ValueError
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(length, MEDIA_RANGE_CHUNK))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(request, path, size, etag):
+    header = request.headers.get("Range")
+    if header and request.headers.get("If-Range", etag) == etag:
+        try:
+            byte_range = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+    else:
+        byte_range = None
+    if byte_range is None:
+        return FileResponse(open(path, "rb"))
+    start, end = byte_range
+    if end == size - 1:
+        # An open-ended range still goes out through the server's
+        # sendfile(): FileResponse sends from the current position.
+        file = open(path, "rb")
+        file.seek(start)
+        response = FileResponse(file)
+    else:
+        response = StreamingHttpResponse(
+            read_range(path, start, end - start + 1),
+            content_type=mimetypes.guess_type(path)[0],
+        )
+    response.status_code = 206
+    response["Content-Length"] = end - start + 1
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
+
+
+def proxy_response(path):
+    header = settings.MEDIA_SENDFILE_HEADER
+    response = HttpResponse(content_type=mimetypes.guess_type(path)[0])
+    if header.lower() == "x-accel-redirect":
+        response[header] = quote(
+            settings.MEDIA_ACCEL_REDIRECT_LOCATION
+            + os.path.relpath(path, settings.MEDIA_ROOT)
+        )
+    else:
+        response[header] = path
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404("Файл не найден")
+    if not os.path.isfile(full_path):
+        raise Http404("Файл не найден")
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        response = (
+            proxy_response(full_path)
+            if settings.MEDIA_SENDFILE_HEADER
+            else file_response(request, full_path, stat.st_size, etag)
+        )
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Accept-Ranges"] = "bytes"
+    if is_immutable(path):
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=MEDIA_IMMUTABLE_MAX_AGE,
+            immutable=True,
+        )
+    return response
@@ -33,6 +33,17 @@ class PostModelAdapter(StudentModelAdapter):
             "author",
             "category",
             "location",
+            "comment_count",
+            "is_visible",
+            "category_is_published",
+            "location_is_published",
+            "excerpt",
+            "text_html",
+            "image_width",
+            "image_height",
+            "image_sha256",
+            "image_derivatives",
+            "updated_at",
             "refresh_from_db",
         ]
 
@@ -0,0 +1,64 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что счётчик комментариев увеличивается при добавлении"
+        " комментария."
+    )
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что счётчик комментариев уменьшается при удалении"
+        " комментария."
+    )
+
+
+def test_stale_post_save_keeps_comment_count(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    loaded = type(post).objects.get(pk=post.pk)
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    loaded.title = "Новый заголовок"
+    loaded.save()
+    loaded.refresh_from_db()
+    assert loaded.title == "Новый заголовок"
+    assert loaded.comment_count == 3, (
+        "Убедитесь, что сохранение публикации не перезаписывает счётчик"
+        " комментариев устаревшим значением."
+    )
+
+
+def test_reconcile_comment_counts(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=7)
+    assert "Комментарии (7)" in client.get("/").content.decode("utf-8")
+
+    call_command(
+        "reconcile_comment_counts", "--dry-run", stdout=StringIO()
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 7
+
+    call_command(
+        "reconcile_comment_counts", "--batch-size=1", stdout=StringIO()
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что команда `reconcile_comment_counts` исправляет"
+        " расхождения счётчика комментариев."
+    )
+    assert "Комментарии (2)" in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что после исправления счётчика кэш ленты сбрасывается."
+    )
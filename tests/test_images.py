@@ -0,0 +1,282 @@
+import hashlib
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog import images
+from blog.images import (build_in_worker, build_post_derivatives,
+                         derivative_name, generate_derivatives)
+from blog.models import Post
+from blog.uploads import inspect_image
+from core.storage import ContentAddressedStorage, is_immutable
+from core.views import serve_media
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("media_root")]
+
+
+def image_bytes(size):
+    buffer = BytesIO()
+    Image.new("RGB", size, "teal").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def store_image(name, size):
+    return default_storage.save(name, ContentFile(image_bytes(size)))
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    calls = []
+
+    class Pool:
+        def submit(self, *args):
+            calls.append(args)
+
+    monkeypatch.setattr(images, "derivative_pool", Pool)
+    return calls
+
+
+@pytest.fixture
+def image_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=store_image("posts_images/photo.jpg", (1200, 800)),
+    )
+
+
+def test_generate_derivatives():
+    name = store_image("posts_images/photo.jpg", (1200, 800))
+    assert generate_derivatives(name) == [320, 640, 960]
+    with default_storage.open(derivative_name(name, 320, "webp")) as file:
+        with Image.open(file) as image:
+            assert image.format == "WEBP"
+            assert image.size == (320, 213)
+    assert default_storage.exists(derivative_name(name, 960, "jpeg"))
+
+
+def test_exif_orientation_is_applied():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # повёрнуто на 90° по часовой стрелке
+    buffer = BytesIO()
+    Image.new("RGB", (1200, 800), "teal").save(buffer, "JPEG", exif=exif)
+    name = default_storage.save(
+        "posts_images/phone.jpg", ContentFile(buffer.getvalue())
+    )
+    assert generate_derivatives(name) == [320, 640]
+    with default_storage.open(derivative_name(name, 320, "jpeg")) as file:
+        with Image.open(file) as image:
+            assert image.size == (320, 480), (
+                "Убедитесь, что уменьшенные копии учитывают ориентацию"
+                " фото из EXIF."
+            )
+
+
+def test_existing_derivatives_are_kept(monkeypatch):
+    name = store_image("posts_images/photo.jpg", (1200, 800))
+    generate_derivatives(name)
+    monkeypatch.setattr(
+        default_storage,
+        "delete",
+        lambda path: pytest.fail("Существующая копия перезаписана"),
+    )
+    monkeypatch.setattr(
+        default_storage,
+        "save",
+        lambda path, content: pytest.fail("Существующая копия перезаписана"),
+    )
+    assert generate_derivatives(name) == [320, 640, 960]
+
+
+def test_small_image_is_not_upscaled():
+    name = store_image("posts_images/small.jpg", (200, 100))
+    assert generate_derivatives(name) == [200]
+
+
+def test_new_image_is_scheduled_after_commit(
+        scheduled, django_capture_on_commit_callbacks, mixer, user):
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend(
+            "blog.Post",
+            author=user,
+            image=store_image("posts_images/photo.jpg", (1200, 800)),
+        )
+    assert scheduled == [(build_in_worker, post.pk, post.image.name)]
+
+    post.image_derivatives = [320]
+    with django_capture_on_commit_callbacks(execute=True):
+        post.title = "Новый заголовок"
+        post.save()
+    assert len(scheduled) == 1, (
+        "Убедитесь, что копии фото не пересобираются, если фото не менялось."
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = store_image("posts_images/other.jpg", (1200, 800))
+        post.save()
+    assert post.image_derivatives == []
+    assert scheduled[-1] == (build_in_worker, post.pk, post.image.name)
+
+
+def test_pages_offer_srcset(client, scheduled, image_post):
+    build_post_derivatives(image_post.pk, image_post.image.name)
+    image_post.refresh_from_db()
+    assert image_post.image_derivatives == [320, 640, 960]
+    webp = derivative_name(image_post.image.name, 320, "webp")
+    for url in ("/", f"/posts/{image_post.pk}/"):
+        content = client.get(url).content.decode("utf-8")
+        assert 'type="image/webp"' in content
+        assert f"/{webp} 320w" in content, (
+            "Убедитесь, что страницы предлагают браузеру уменьшенные копии"
+            " фото через srcset."
+        )
+
+
+def test_stale_instance_keeps_derivatives(scheduled, image_post):
+    loaded = Post.objects.get(pk=image_post.pk)
+    build_post_derivatives(image_post.pk, image_post.image.name)
+    loaded.title = "Новый заголовок"
+    loaded.save()
+    loaded.refresh_from_db()
+    assert loaded.title == "Новый заголовок"
+    assert loaded.image_derivatives == [320, 640, 960], (
+        "Убедитесь, что сохранение публикации с прежним фото не стирает"
+        " ширины уменьшенных копий."
+    )
+    loaded.save(update_fields=["title"])
+    loaded.refresh_from_db()
+    assert loaded.image_derivatives == [320, 640, 960]
+
+
+def test_same_image_reuses_derivatives(
+        scheduled, mixer, user, image_post, monkeypatch):
+    build_post_derivatives(image_post.pk, image_post.image.name)
+    twin = mixer.blend("blog.Post", author=user, image=image_post.image.name)
+    monkeypatch.setattr(
+        images, "generate_derivatives",
+        lambda name: pytest.fail("Копии одного и того же фото пересобраны"),
+    )
+    build_post_derivatives(twin.pk, twin.image.name)
+    twin.refresh_from_db()
+    assert twin.image_derivatives == [320, 640, 960]
+
+
+def test_stale_image_is_not_recorded(scheduled, image_post):
+    name = image_post.image.name
+    image_post.image = store_image("posts_images/other.jpg", (800, 600))
+    image_post.save()
+    build_post_derivatives(image_post.pk, name)
+    image_post.refresh_from_db()
+    assert image_post.image_derivatives == []
+
+
+def test_command(scheduled, image_post):
+    output = StringIO()
+    call_command(
+        "generate_image_derivatives", "--workers", "1", "--missing",
+        stdout=output,
+    )
+    assert "Обработано изображений: 1" in output.getvalue()
+    assert Post.objects.get(pk=image_post.pk).image_derivatives == [
+        320, 640, 960
+    ]
+
+
+def test_upload_is_measured_and_hashed(
+        client, scheduled, mixer, user, published_category):
+    content = image_bytes((1200, 800))
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=SimpleUploadedFile("photo.jpg", content, "image/jpeg"),
+    )
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (1200, 800)
+    assert post.image_sha256 == hashlib.sha256(content).hexdigest()
+    for url in ("/", f"/posts/{post.pk}/"):
+        content = client.get(url).content.decode("utf-8")
+        assert 'width="1200" height="800"' in content, (
+            "Убедитесь, что у фото публикации указаны ширина и высота."
+        )
+
+    post.image = None
+    post.save()
+    assert (post.image_width, post.image_height, post.image_sha256) == (
+        None, None, ""
+    )
+
+
+def test_inspect_non_image():
+    width, height, digest = inspect_image(ContentFile(b"not an image"))
+    assert (width, height) == (None, None)
+    assert digest == hashlib.sha256(b"not an image").hexdigest()
+
+
+def test_backfill_image_metadata(image_post):
+    Post.objects.update(image_sha256="")
+    output = StringIO()
+    call_command("backfill_image_metadata", "--missing", stdout=output)
+    assert "Обновлено публикаций: 1" in output.getvalue()
+    image_post.refresh_from_db()
+    assert (image_post.image_width, image_post.image_height) == (1200, 800)
+    assert len(image_post.image_sha256) == 64
+
+
+def test_uploads_are_content_addressed(
+        rf, scheduled, mixer, user, media_root):
+    content = image_bytes((400, 300))
+    digest = hashlib.sha256(content).hexdigest()
+    first, second = (
+        mixer.blend(
+            "blog.Post",
+            author=user,
+            image=SimpleUploadedFile(filename, content, "image/jpeg"),
+        )
+        for filename in ("first.JPG", "second.JPG")
+    )
+    expected = f"posts_images/{digest[:2]}/{digest[2:4]}/{digest}.jpg"
+    assert first.image.name == second.image.name == expected, (
+        "Убедитесь, что фото хранятся под именем из хеша содержимого."
+    )
+    assert len(list(media_root.rglob("*.jpg"))) == 1, (
+        "Убедитесь, что одинаковые фото хранятся на диске один раз."
+    )
+    assert is_immutable(derivative_name(expected, 320, "webp"))
+    assert not is_immutable("posts_images/photo.jpg")
+
+    response = serve_media(rf.get(first.image.url), first.image.name)
+    assert response.status_code == 200
+    assert "immutable" in response["Cache-Control"]
+    assert "max-age=31536000" in response["Cache-Control"]
+
+
+def test_racing_identical_upload_is_deduplicated(monkeypatch, media_root):
+    storage = ContentAddressedStorage()
+    content = image_bytes((40, 30))
+    name = storage.save("posts_images/first.jpg", ContentFile(content))
+    exists = storage.exists
+    checks = []
+
+    def racing_exists(path):
+        # Первая проверка «не видит» файл, как если бы его только что
+        # записала параллельная загрузка.
+        checks.append(path)
+        return len(checks) > 1 and exists(path)
+
+    monkeypatch.setattr(storage, "exists", racing_exists)
+    assert storage.save(
+        "posts_images/second.jpg", ContentFile(content)
+    ) == name, (
+        "Убедитесь, что одновременная загрузка того же файла не сохраняет"
+        " его копию под другим именем."
+    )
+    assert len(list(media_root.rglob("*.jpg"))) == 1
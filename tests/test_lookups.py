@@ -0,0 +1,52 @@
+import pytest
+
+from blog import lookups
+from blog.lookups import attach_catalog, categories
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_category_lookup_is_shared_and_refreshed(
+        published_category, django_assert_num_queries):
+    assert categories.get(slug=published_category.slug) is not None
+    with django_assert_num_queries(0):
+        category = categories.get(pk=published_category.pk)
+    assert category.slug == published_category.slug
+    published_category.title = "Новое название"
+    published_category.save()
+    assert categories.get(slug=published_category.slug).title == (
+        "Новое название"
+    ), "Убедитесь, что кэш категорий обновляется при их сохранении."
+
+
+def test_category_page_without_category_query(
+        client, post_with_published_location, django_assert_num_queries):
+    url = f"/category/{post_with_published_location.category.slug}/"
+    client.get(url)
+    # только страница публикаций: количество уже в кэше, категория —
+    # в кэше справочников
+    with django_assert_num_queries(1):
+        response = client.get(url, {"page": 1})
+    assert response.context["category"] == (
+        post_with_published_location.category
+    )
+
+
+def test_catalog_version_is_checked_once_per_page(
+        many_posts_with_published_locations, monkeypatch):
+    calls = []
+    get_tag_versions = lookups.get_tag_versions
+
+    def counting(tags):
+        calls.append(tags)
+        return get_tag_versions(tags)
+
+    monkeypatch.setattr(lookups, "get_tag_versions", counting)
+    posts = attach_catalog(list(Post.objects.for_feed()))
+    assert len(posts) > 1
+    assert all(post.category.slug for post in posts)
+    assert len(calls) == 1, (
+        "Убедитесь, что версия справочников проверяется один раз на"
+        " страницу, а не для каждой публикации."
+    )
@@ -0,0 +1,101 @@
+import hashlib
+
+import pytest
+from django.http import Http404
+from django.test import override_settings
+
+from core.views import serve_media
+
+DATA = bytes(range(256)) * 4
+DIGEST = hashlib.sha256(DATA).hexdigest()
+NAME = f"posts_images/{DIGEST[:2]}/{DIGEST[2:4]}/{DIGEST}.jpg"
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_file(media_root):
+    path = media_root / NAME
+    path.parent.mkdir(parents=True)
+    path.write_bytes(DATA)
+    return path
+
+
+def body(response):
+    content = b"".join(response.streaming_content)
+    response.close()
+    return content
+
+
+def test_full_file(client):
+    response = client.get(f"/{NAME}")
+    assert response.status_code == 200
+    assert body(response) == DATA
+    assert response["Accept-Ranges"] == "bytes"
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с именем из хеша отдаются с долгим сроком"
+        " кеширования."
+    )
+
+    response = client.get(f"/{NAME}", HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=10-19", DATA[10:20]),
+        ("bytes=1000-", DATA[1000:]),
+        ("bytes=-24", DATA[-24:]),
+    ],
+)
+def test_range(client, header, expected):
+    response = client.get(f"/{NAME}", HTTP_RANGE=header)
+    assert response.status_code == 206
+    assert body(response) == expected
+    assert int(response["Content-Length"]) == len(expected)
+    assert response["Content-Range"].endswith(f"/{len(DATA)}")
+
+
+def test_unsatisfiable_range(client):
+    response = client.get(f"/{NAME}", HTTP_RANGE="bytes=5000-")
+    assert response.status_code == 416
+    assert response["Content-Range"] == f"bytes */{len(DATA)}"
+
+
+def test_stale_if_range_gets_whole_file(client):
+    response = client.get(
+        f"/{NAME}", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"old"'
+    )
+    assert response.status_code == 200
+    assert body(response) == DATA
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("X-Accel-Redirect", f"/protected-media/{NAME}"),
+        ("X-Sendfile", None),
+    ],
+)
+def test_proxy_delivery(client, media_file, header, expected):
+    with override_settings(MEDIA_SENDFILE_HEADER=header):
+        response = client.get(f"/{NAME}")
+    assert response.status_code == 200
+    assert response.content == b"", (
+        "Убедитесь, что при передаче файла прокси Django не отдаёт его сам."
+    )
+    assert response[header] == (expected or str(media_file))
+    assert "ETag" in response
+
+
+def test_missing_and_outside_files(client, rf):
+    assert client.get("/posts_images/missing.jpg").status_code == 404
+    assert client.post(f"/{NAME}").status_code == 405
+    with pytest.raises(Http404):
+        serve_media(rf.get("/"), "../outside.jpg")
+
+
+def test_pages_keep_slash_redirects(client):
+    response = client.get("/pages/about")
+    assert response.status_code == 301
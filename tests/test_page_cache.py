@@ -0,0 +1,223 @@
+import gzip
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils.text import compress_string
+
+from blog import mixins
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def page_urls(post_with_published_location):
+    post = post_with_published_location
+    return [
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    ]
+
+
+def test_anonymous_pages_are_cached(
+        client, page_urls, django_assert_num_queries):
+    for url in page_urls:
+        first = client.get(url)
+        assert first["X-Page-Cache"] == "MISS"
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second["X-Page-Cache"] == "HIT", (
+            f"Убедитесь, что страница {url} кэшируется для анонимных"
+            " пользователей."
+        )
+        assert second.content == first.content
+
+
+def test_page_cache_invalidated_on_save(
+        client, page_urls, post_with_published_location):
+    for url in page_urls:
+        client.get(url)
+    post_with_published_location.title = "Новый заголовок"
+    post_with_published_location.save()
+    for url in page_urls:
+        response = client.get(url)
+        assert response["X-Page-Cache"] == "MISS"
+        assert "Новый заголовок" in response.content.decode("utf-8")
+
+
+def test_authenticated_pages_are_not_cached(user_client, page_urls):
+    for url in page_urls:
+        user_client.get(url)
+        assert "X-Page-Cache" not in user_client.get(url)
+
+
+def test_page_cache_stats(client, page_urls):
+    client.get(page_urls[0])
+    client.get(page_urls[0])
+    output = StringIO()
+    call_command("page_cache_stats", "--reset", stdout=output)
+    lines = output.getvalue().splitlines()
+    assert "Доля попаданий: 50.0%" in lines, (
+        "Убедитесь, что команда page_cache_stats выводит каждый показатель"
+        " на отдельной строке."
+    )
+
+
+def test_comment_invalidates_only_its_post(
+        client, mixer, page_urls, post_with_published_location,
+        another_category):
+    post = post_with_published_location
+    other_url = f"/category/{another_category.slug}/"
+    for url in page_urls + [other_url]:
+        client.get(url)
+    mixer.blend("blog.Comment", post=post, author=post.author)
+    assert client.get(f"/posts/{post.id}/")["X-Page-Cache"] == "MISS"
+    assert client.get(other_url)["X-Page-Cache"] == "HIT", (
+        "Убедитесь, что новый комментарий не сбрасывает кэш страниц,"
+        " на которых нет этой публикации."
+    )
+
+
+def test_category_change_invalidates_old_category_page(
+        client, post_with_published_location, another_category):
+    post = post_with_published_location
+    old_url = f"/category/{post.category.slug}/"
+    new_url = f"/category/{another_category.slug}/"
+    client.get(old_url)
+    client.get(new_url)
+    post.category = another_category
+    post.save()
+    old_response = client.get(old_url)
+    assert old_response["X-Page-Cache"] == "MISS"
+    assert post.title not in old_response.content.decode("utf-8")
+    new_response = client.get(new_url)
+    assert new_response["X-Page-Cache"] == "MISS"
+    assert post.title in new_response.content.decode("utf-8")
+
+
+def test_post_card_fragment_is_shared_between_feeds(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.get("/")
+    type(post).objects.filter(pk=post.pk).update(title="Без сигнала")
+    response = user_client.get(f"/category/{post.category.slug}/")
+    assert "Без сигнала" not in response.content.decode("utf-8"), (
+        "Убедитесь, что карточка публикации кэшируется и переиспользуется"
+        " в разных лентах."
+    )
+    post.refresh_from_db()
+    post.save()
+    response = user_client.get(f"/profile/{post.author.username}/")
+    assert "Без сигнала" in response.content.decode("utf-8")
+
+
+def test_conditional_get(
+        client, page_urls, post_with_published_location,
+        django_assert_num_queries, monkeypatch):
+    etags = {}
+    for url in page_urls:
+        client.get(url)
+        first = client.get(url)
+        etags[url], last_modified = first["ETag"], first["Last-Modified"]
+        with monkeypatch.context() as patched:
+            patched.setattr(
+                mixins, "fill_holes", lambda *args: pytest.fail("rendered")
+            )
+            with django_assert_num_queries(0):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 304, (
+            f"Убедитесь, что страница {url} отвечает 304 на запрос с"
+            " актуальным ETag."
+        )
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304
+    post_with_published_location.save()
+    for url in page_urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200
+
+
+@override_settings(PAGE_CACHE_AUTHENTICATED=True)
+def test_users_share_body_with_own_header(
+        client, user_client, user, page_urls):
+    for url in page_urls:
+        client.get(url)
+        response = user_client.get(url)
+        assert response["X-Page-Cache"] == "HIT", (
+            f"Убедитесь, что страница {url} отдаётся авторизованным"
+            " пользователям из общего кэша."
+        )
+        assert f">{user.username}</a>" in response.content.decode("utf-8")
+        anonymous = client.get(url).content.decode("utf-8")
+        assert f">{user.username}</a>" not in anonymous
+
+
+@override_settings(PAGE_CACHE_AUTHENTICATED=True)
+def test_detail_holes_are_per_user(
+        user_client, another_user_client, mixer, user,
+        post_with_published_location):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post, author=user)
+    url = f"/posts/{post.id}/"
+    own = user_client.get(url).content.decode("utf-8")
+    response = another_user_client.get(url)
+    assert response["X-Page-Cache"] == "HIT"
+    foreign = response.content.decode("utf-8")
+    assert "Отредактировать комментарий" in own
+    assert "Отредактировать комментарий" not in foreign, (
+        "Убедитесь, что ссылки на редактирование комментария из общего"
+        " кэша видит только его автор."
+    )
+    assert "csrfmiddlewaretoken" in foreign
+    assert "<!--hole:" not in foreign
+
+
+@override_settings(PAGE_CACHE_AUTHENTICATED=True)
+def test_unpublished_post_is_not_shared(
+        user_client, client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = user_client.get(f"/posts/{post.id}/")
+    assert response.status_code == 200
+    assert "X-Page-Cache" not in response
+    assert client.get(f"/posts/{post.id}/").status_code == 404
+
+
+@override_settings(PAGE_CACHE_AUTHENTICATED=True, COMMENT_FORM_FRAGMENT=True)
+def test_comment_form_is_fetched_separately(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    content = user_client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert "csrfmiddlewaretoken" not in content, (
+        "Убедитесь, что в режиме отдельной загрузки формы страница"
+        " публикации не содержит CSRF-токена."
+    )
+    assert f'data-comment-form="/posts/{post.id}/comment_form/"' in content
+    response = user_client.get(f"/posts/{post.id}/comment_form/")
+    assert "csrfmiddlewaretoken" in response.content.decode("utf-8")
+    assert "no-store" in response["Cache-Control"]
+
+
+def test_anonymous_page_is_compressed_once(
+        client, post_with_published_location, monkeypatch):
+    calls = []
+
+    def counting_compress(content):
+        calls.append(content)
+        return compress_string(content)
+
+    monkeypatch.setattr(mixins, "compress_string", counting_compress)
+    url = f"/posts/{post_with_published_location.id}/"
+    plain = client.get(url).content
+    for _ in range(2):
+        response = client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        assert response["Content-Encoding"] == "gzip"
+        assert gzip.decompress(response.content) == plain
+    assert len(calls) == 1, (
+        "Убедитесь, что страница из кэша сжимается один раз, а не при"
+        " каждом запросе."
+    )
@@ -0,0 +1,145 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.paginators import FeedPaginator
+from blog.views import PostListView
+from blogicum.constants import COMMENTS_PAGE_NUM
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+CURSOR_RE = re.compile(r'href="\?cursor=([\w-]+)"')
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    now = timezone.now()
+    # Пары публикаций с одинаковым временем проверяют сортировку по id.
+    pub_dates = (
+        now - timedelta(hours=i // 2) for i in range(N_PER_PAGE * 3)
+    )
+    return mixer.cycle(N_PER_PAGE * 3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+def walk_cursors(client, url):
+    seen = []
+    response = client.get(url)
+    seen.extend(post.id for post in response.context["page_obj"])
+    next_cursor = response.context["page_obj"].next_cursor
+    while next_cursor:
+        response = client.get(url, {"cursor": next_cursor})
+        assert response.status_code == 200
+        seen.extend(post.id for post in response.context["page_obj"])
+        next_cursor = response.context["page_obj"].next_cursor
+    return seen, response
+
+
+@pytest.mark.parametrize("url_name", ["index", "category", "profile"])
+def test_cursor_walk_matches_offset_order(
+        client, feed_posts, published_category, user, url_name):
+    url = {
+        "index": "/",
+        "category": f"/category/{published_category.slug}/",
+        "profile": f"/profile/{user.username}/",
+    }[url_name]
+    expected = [
+        post.id for post in sorted(
+            feed_posts, key=lambda post: (post.pub_date, post.id),
+            reverse=True
+        )
+    ]
+    seen, last_response = walk_cursors(client, url)
+    assert seen == expected, (
+        "Убедитесь, что курсорная пагинация проходит ленту без пропусков и"
+        " повторов в порядке «от новых к старым»."
+    )
+
+    previous_cursor = last_response.context["page_obj"].previous_cursor
+    response = client.get(url, {"cursor": previous_cursor})
+    page_ids = [post.id for post in response.context["page_obj"]]
+    assert page_ids == expected[N_PER_PAGE:N_PER_PAGE * 2], (
+        "Убедитесь, что курсор на предыдущую страницу возвращает"
+        " предыдущую страницу ленты."
+    )
+
+
+def test_paginator_renders_cursor_links(client, feed_posts):
+    content = client.get("/").content.decode("utf-8")
+    assert CURSOR_RE.search(content), (
+        "Убедитесь, что пагинатор выводит ссылку на следующую страницу"
+        " с курсором."
+    )
+
+
+def test_invalid_cursor_is_404(client, feed_posts):
+    response = client.get("/", {"cursor": "not-a-cursor"})
+    assert response.status_code == 404
+
+
+def test_comments_load_more(
+        client, mixer, post_with_published_location,
+        django_assert_num_queries):
+    post = post_with_published_location
+    mixer.cycle(COMMENTS_PAGE_NUM + 5).blend("blog.Comment", post=post)
+
+    # публикация и одна страница комментариев вместе с авторами
+    with django_assert_num_queries(2):
+        response = client.get(f"/posts/{post.id}/")
+    first_page = response.context["comments"]
+    assert len(first_page) == COMMENTS_PAGE_NUM, (
+        "Убедитесь, что на странице публикации комментарии выводятся"
+        " постранично."
+    )
+
+    response = client.get(
+        f"/posts/{post.id}/comments/", {"cursor": first_page.next_cursor}
+    )
+    assert response.status_code == 200
+    rest = list(response.context["comments"])
+    assert len(rest) == 5
+    assert rest[0].created_at >= first_page[len(first_page) - 1].created_at
+    assert not response.context["comments"].has_next()
+
+
+def test_feed_count_is_cached(client, feed_posts, django_assert_num_queries):
+    client.get("/")
+    # без COUNT(*): один запрос страницы с присоединёнными связями
+    with django_assert_num_queries(1):
+        response = client.get("/", {"page": 2})
+    assert response.context["page_obj"].paginator.count == len(feed_posts)
+
+
+def test_feed_degrades_to_prev_next(client, feed_posts, monkeypatch):
+    monkeypatch.setattr(FeedPaginator, "exact_count_limit", N_PER_PAGE)
+    response = client.get("/", {"page": 3})
+    page = response.context["page_obj"]
+    assert not page.paginator.count_is_exact
+    assert len(page) == N_PER_PAGE
+    assert not page.has_next()
+    content = response.content.decode("utf-8")
+    assert "Последняя" not in content, (
+        "Убедитесь, что без точного количества публикаций пагинатор"
+        " выводит только ссылки «назад» и «вперёд»."
+    )
+    assert client.get("/", {"page": 4}).status_code == 404
+
+
+@pytest.mark.parametrize("page_number", [1, 15, 30])
+def test_page_range_is_elided(client, feed_posts, monkeypatch, page_number):
+    monkeypatch.setattr(PostListView, "paginate_by", 1)
+    content = client.get("/", {"page": page_number}).content.decode("utf-8")
+    page_links = re.findall(r'href="\?page=\d+"', content)
+    assert len(page_links) <= 10, (
+        "Убедитесь, что пагинатор выводит сокращённый список страниц, а не"
+        " ссылку на каждую страницу."
+    )
+    assert "…" in content
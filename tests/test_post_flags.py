@@ -0,0 +1,50 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_category_unpublish_propagates(
+        client, many_posts_with_published_locations, published_category):
+    published_category.is_published = False
+    published_category.save()
+    assert not Post.published_posts.exists(), (
+        "Убедитесь, что публикации категории, снятой с публикации, не"
+        " попадают в ленты."
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert Post.published_posts.count() == len(
+        many_posts_with_published_locations
+    )
+
+
+def test_location_delete_propagates(post_with_published_location):
+    post_with_published_location.location.delete()
+    post_with_published_location.refresh_from_db()
+    assert not post_with_published_location.location_is_published
+
+
+def test_check_post_flags(
+        client, post_with_published_location, published_category):
+    client.get("/")
+    type(published_category).objects.filter(
+        pk=published_category.pk
+    ).update(is_published=False)
+    output = StringIO()
+    call_command("check_post_flags", stdout=output)
+    assert "Всего расхождений: 1" in output.getvalue()
+    assert Post.published_posts.exists()
+
+    call_command("check_post_flags", "--fix", stdout=StringIO())
+    assert not Post.published_posts.exists(), (
+        "Убедитесь, что команда `check_post_flags --fix` исправляет"
+        " расхождения."
+    )
+    assert not client.get("/").context["page_obj"], (
+        "Убедитесь, что после исправления признаков кэш ленты сбрасывается."
+    )
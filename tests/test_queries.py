@@ -0,0 +1,122 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.lookups import categories, locations
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def warm_lookups(post_with_published_location):
+    categories.get(pk=post_with_published_location.category_id)
+    locations.get(pk=post_with_published_location.location_id)
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+
+
+@pytest.mark.parametrize(
+    ("url_template", "expected_queries"),
+    [
+        # сессия, пользователь, публикация с автором, категорией и
+        # местоположением, комментарии
+        ("/posts/{post.id}/", 4),
+        # сессия, пользователь, публикация, варианты местоположений и
+        # категорий для формы
+        ("/posts/{post.id}/edit/", 5),
+        # сессия, пользователь, публикация, местоположение
+        ("/posts/{post.id}/delete/", 4),
+        # сессия, пользователь, публикации, количество публикаций,
+        # автор профиля
+        ("/profile/{post.author.username}/", 5),
+    ],
+    ids=["detail", "edit", "delete", "profile"],
+)
+def test_post_pages_fetch_objects_once(
+        user_client, post_with_published_location, warm_lookups,
+        url_template, expected_queries, django_assert_num_queries):
+    url = url_template.format(post=post_with_published_location)
+    with django_assert_num_queries(expected_queries):
+        response = user_client.get(url)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "url_template",
+    [
+        "/posts/{comment.post_id}/edit_comment/{comment.id}/",
+        "/posts/{comment.post_id}/delete_comment/{comment.id}/",
+    ],
+    ids=["edit", "delete"],
+)
+def test_comment_pages_fetch_comment_once(
+        user_client, own_comment, url_template, django_assert_num_queries):
+    url = url_template.format(comment=own_comment)
+    # сессия, пользователь, комментарий
+    with django_assert_num_queries(3):
+        response = user_client.get(url)
+    assert response.status_code == 200
+
+
+def test_foreign_post_edit_redirects_without_refetch(
+        another_user_client, post_with_published_location,
+        django_assert_num_queries):
+    url = f"/posts/{post_with_published_location.id}/edit/"
+    # сессия, пользователь, публикация
+    with django_assert_num_queries(3):
+        response = another_user_client.get(url)
+    assert response.status_code == 302
+
+
+def test_feed_benchmark(post_with_published_location):
+    output = StringIO()
+    call_command("bench_feed", "--iterations=1", stdout=output)
+    lines = output.getvalue().splitlines()
+    assert lines[0].startswith("prefetch_related: запросов 4")
+    assert lines[1].startswith("for_feed: запросов 1")
+
+
+@pytest.mark.parametrize("url_name", ["index", "category", "profile"])
+def test_feed_query_shape(
+        client, post_with_published_location, warm_lookups,
+        django_assert_max_num_queries, url_name):
+    post = post_with_published_location
+    url = {
+        "index": "/",
+        "category": f"/category/{post.category.slug}/",
+        "profile": f"/profile/{post.author.username}/",
+    }[url_name]
+    client.get(url)
+    with django_assert_max_num_queries(2) as captured:
+        client.get(url, {"page": 1})
+    # кроме ленты — только автор профиля
+    [sql] = [
+        query["sql"] for query in captured.captured_queries
+        if 'FROM "blog_post"' in query["sql"]
+    ]
+    assert "GROUP BY" not in sql, (
+        "Убедитесь, что ленты не подсчитывают комментарии через GROUP BY."
+    )
+    assert '"blog_post"."text"' not in sql, (
+        "Убедитесь, что ленты не загружают полный текст публикаций."
+    )
+    assert 'JOIN "auth_user"' in sql
+    for table in ("blog_category", "blog_location"):
+        assert f'JOIN "{table}"' not in sql, (
+            "Убедитесь, что категории и местоположения берутся из"
+            " кэша справочников, а не присоединяются к запросу ленты."
+        )
+
+
+def test_with_comment_count_is_opt_in(post_with_published_location, mixer):
+    mixer.cycle(2).blend("blog.Comment", post=post_with_published_location)
+    assert "GROUP BY" not in str(Post.objects.published().query)
+    post = Post.objects.with_comment_count().get()
+    assert post.comment_total == post.comment_count == 2
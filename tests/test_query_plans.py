@@ -0,0 +1,27 @@
+import pytest
+
+from blog.query_plans import explain_hot_querysets, plan_problems
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_plan_problems_detects_regressions():
+    assert plan_problems("5 0 0 SCAN blog_post")
+    assert plan_problems("2 0 0 SCAN TABLE blog_post")
+    assert plan_problems("35 0 0 USE TEMP B-TREE FOR ORDER BY")
+    assert not plan_problems(
+        "6 0 0 SEARCH blog_post USING INDEX post_published_feed_idx"
+    )
+    assert not plan_problems(
+        "3 0 0 SCAN blog_post USING INDEX post_published_feed_idx"
+    )
+
+
+def test_feed_querysets_use_indexes():
+    plans = explain_hot_querysets()
+    assert plans
+    for name, plan, problems in plans:
+        assert not problems, (
+            f"Запрос ленты `{name}` не использует индекс: "
+            f"{', '.join(problems)}.\n{plan}"
+        )
@@ -0,0 +1,89 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_rendered_on_save(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        text="<b>раз</b>\nдва три четыре пять шесть семь восемь девять десять"
+             " одиннадцать",
+    )
+    assert post.excerpt.endswith("десять …")
+    assert post.text_html.startswith("&lt;b&gt;раз&lt;/b&gt;<br>")
+    comment = mixer.blend("blog.Comment", post=post, author=user, text="а\nб")
+    assert comment.text_html == "а<br>б"
+
+
+def test_feeds_do_not_load_text(
+        client, post_with_published_location):
+    response = client.get("/")
+    post = response.context["page_obj"][0]
+    assert "text" in post.get_deferred_fields(), (
+        "Убедитесь, что ленты не загружают полный текст публикаций."
+    )
+
+
+def test_backfill_command(mixer, user, published_category):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    Post.objects.update(excerpt="", text_html="")
+    Comment.objects.update(text_html="")
+    output = StringIO()
+    call_command(
+        "backfill_rendered_text", "--missing", "--batch-size=1",
+        stdout=output,
+    )
+    assert "Обновлено публикаций: 1, комментариев: 1" in output.getvalue()
+    post.refresh_from_db()
+    comment.refresh_from_db()
+    assert post.excerpt and post.text_html
+    assert comment.text_html
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_renders_existing_rows():
+    before = [("blog", "0012_post_published_flags")]
+    after = [("blog", "0013_rendered_text")]
+    executor = MigrationExecutor(connection)
+    latest = executor.loader.graph.leaf_nodes()
+    executor.migrate(before)
+    try:
+        apps = executor.loader.project_state(before).apps
+        author = apps.get_model("auth", "User").objects.create(
+            username="migration"
+        )
+        post = apps.get_model("blog", "Post").objects.create(
+            title="Заголовок",
+            text="раз\nдва",
+            pub_date=timezone.now(),
+            author_id=author.pk,
+        )
+        apps.get_model("blog", "Comment").objects.create(
+            text="а\nб", post_id=post.pk, author_id=author.pk
+        )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(after)
+        apps = executor.loader.project_state(after).apps
+        post = apps.get_model("blog", "Post").objects.get()
+        comment = apps.get_model("blog", "Comment").objects.get()
+        assert (post.excerpt, post.text_html) == ("раз два", "раз<br>два")
+        assert comment.text_html == "а<br>б", (
+            "Убедитесь, что миграция заполняет HTML-версии текстов уже"
+            " существующих публикаций и комментариев."
+        )
+    finally:
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(latest)
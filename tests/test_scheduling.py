@@ -0,0 +1,50 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_visibility_is_computed_on_save(future_posts, published_category):
+    post = future_posts[0]
+    assert not post.is_visible
+    post.pub_date = timezone.now() - timedelta(minutes=1)
+    post.save(update_fields=["pub_date"])
+    post.refresh_from_db()
+    assert post.is_visible
+    post.is_published = False
+    post.save()
+    post.refresh_from_db()
+    assert not post.is_visible
+
+
+def test_publish_scheduled_flips_due_posts(
+        client, future_posts, published_category):
+    due, *later = future_posts
+    Post.objects.filter(pk=due.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1),
+        category=published_category,
+    )
+    assert due not in Post.published_posts.all()
+
+    client.get("/")
+    call_command("publish_scheduled", "--once", stdout=StringIO())
+
+    assert list(Post.published_posts.all()) == [due], (
+        "Убедитесь, что команда `publish_scheduled` делает видимыми"
+        " публикации, дата публикации которых наступила."
+    )
+    response = client.get("/")
+    assert response.context["page_obj"].paginator.count == 1, (
+        "Убедитесь, что при публикации по расписанию сбрасываются"
+        " закэшированные данные лент."
+    )
+    assert not any(
+        Post.objects.filter(pk__in=[post.pk for post in later])
+        .values_list("is_visible", flat=True)
+    )
@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+
+from blog import cache as blog_cache
+from blog.cache import get_or_set_tagged
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_concurrent_recompute_runs_once():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return "значение"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                get_or_set_tagged("single-flight", compute, ["feed:x"], 60)
+            )
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1, (
+        "Убедитесь, что при одновременных промахах кэша значение"
+        " пересчитывается только один раз."
+    )
+    assert results == ["значение"] * 5
+
+
+def test_stale_page_served_while_rebuilding(
+        client, post_with_published_location, django_assert_num_queries):
+    first = client.get("/")
+    post_with_published_location.save()
+    cache.add("lock:page:/", "другой процесс", 10)
+    with django_assert_num_queries(0):
+        response = client.get("/")
+    assert response["X-Page-Cache"] == "STALE"
+    assert response.content == first.content
+
+
+def test_waits_then_renders_without_lock_owner(
+        client, post_with_published_location, monkeypatch):
+    monkeypatch.setattr(blog_cache, "SINGLE_FLIGHT_WAIT", 0.1)
+    cache.add("lock:page:/", "другой процесс", 10)
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response["X-Page-Cache"] == "MISS"
@@ -0,0 +1,113 @@
+import hashlib
+import os
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from PIL import Image
+
+from blog import uploads
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("media_root")]
+
+
+@pytest.fixture
+def post_data(published_category, published_location):
+    return {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": "2024-01-01",
+        "category": published_category.id,
+        "location": published_location.id,
+        "is_published": True,
+    }
+
+
+def jpeg(size=(640, 480)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "olive").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def create_post(client, post_data, content):
+    return client.post(
+        "/posts/create/",
+        {**post_data, "image": SimpleUploadedFile("photo.jpg", content)},
+    )
+
+
+def test_upload_is_streamed_and_hashed(user_client, post_data):
+    content = jpeg()
+    response = create_post(user_client, post_data, content)
+    assert response.status_code == 302
+    post = Post.objects.get()
+    assert (post.image_width, post.image_height) == (640, 480)
+    assert post.image_sha256 == hashlib.sha256(content).hexdigest()
+
+
+def test_large_webp_is_accepted(user_client, post_data):
+    # WebP открывается только целиком, поэтому файл больше предела
+    # на заголовок.
+    buffer = BytesIO()
+    Image.frombytes("RGB", (600, 600), os.urandom(600 * 600 * 3)).save(
+        buffer, "WEBP", lossless=True
+    )
+    content = buffer.getvalue()
+    assert len(content) > uploads.IMAGE_HEADER_LIMIT
+    response = create_post(user_client, post_data, content)
+    assert response.status_code == 302, (
+        "Убедитесь, что загрузка принимает изображения WebP."
+    )
+    post = Post.objects.get()
+    assert (post.image_width, post.image_height) == (600, 600)
+
+
+@pytest.mark.parametrize(
+    "limit, value, content, message",
+    [
+        (
+            "blog.uploads.IMAGE_MAX_UPLOAD_SIZE", 1024, None,
+            "Размер файла превышает",
+        ),
+        (
+            "blog.uploads.IMAGE_MAX_PIXELS", 1000, None,
+            "Изображение слишком большое",
+        ),
+        # Pillow отказывается открывать такие файлы сам.
+        (
+            "PIL.Image.MAX_IMAGE_PIXELS", 1000, None,
+            "Изображение слишком большое",
+        ),
+        (None, None, b"not an image" * 10, "корректное изображение"),
+    ],
+)
+def test_upload_limits(
+        user_client, post_data, media_root, monkeypatch, limit, value,
+        content, message):
+    if limit:
+        monkeypatch.setattr(limit, value)
+    response = create_post(user_client, post_data, content or jpeg())
+    assert response.status_code == 200
+    assert message in str(response.context["form"].errors["image"]), (
+        "Убедитесь, что загрузка изображения проверяет размер файла,"
+        " число пикселей и заголовок изображения."
+    )
+    assert not Post.objects.exists()
+    assert not any(path.is_file() for path in media_root.rglob("*"))
+
+
+def test_header_is_read_without_decoding(monkeypatch):
+    content = jpeg()
+    monkeypatch.setattr(
+        Image.Image, "load", lambda self: pytest.fail("bitmap decoded")
+    )
+    assert uploads.read_header(BytesIO(content)) == ((640, 480), "JPEG")
+
+
+def test_csrf_is_still_checked(user, post_data):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    response = create_post(client, post_data, jpeg())
+    assert response.status_code == 403